@@ -1,19 +1,25 @@
 """AI text generation for fantasy sports recaps and summaries."""
-import json
+import asyncio
+from collections import Counter
+from operator import attrgetter, itemgetter
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+import msgspec
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import Row, select, func
 
+from config import settings
+from database.connection import AsyncSessionLocal
 from models.league import League
 from models.roster import Roster
 from models.matchup import Matchup
 from models.transaction import Transaction
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WeeklyPerformance:
     """Weekly performance data for a team."""
     roster_id: str
@@ -27,7 +33,7 @@ class WeeklyPerformance:
     margin: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PowerRankingEntry:
     """Power ranking entry for a team."""
     rank: int
@@ -43,7 +49,7 @@ class PowerRankingEntry:
     movement: int  # +/- positions
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TransactionSummary:
     """Summary of a transaction for recaps."""
     transaction_type: str
@@ -55,7 +61,7 @@ class TransactionSummary:
     notes: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WeeklySummary:
     """Complete weekly summary data structure."""
     league_name: str
@@ -83,13 +89,56 @@ class WeeklySummary:
     average_score: float
     total_points: float
     playoff_picture: List[str]  # Team names in playoff positions
+    
+    # Rendered text memoized per style by TextFormatter
+    rendered: Dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+
+
+# Player name extraction by decoded JSON type (a single dict lookup per player)
+_PLAYER_NAME_FORMATTERS = {
+    dict: lambda p: p.get('name') or p.get('full_name') or "Unknown Player",
+    str: lambda p: p,
+}
+
+
+def _format_player_name(player_data: Any) -> str:
+    """Format player name from API data."""
+    formatter = _PLAYER_NAME_FORMATTERS.get(type(player_data))
+    return formatter(player_data) if formatter else "Unknown Player"
+
+
+def _parse_player_names(players: Any) -> List[str]:
+    """
+    Turn a stored players_added/players_dropped value into player names.
+    
+    The JSONB column arrives already decoded: a list of player objects, or
+    a mapping keyed by player ID.
+    """
+    try:
+        return [_format_player_name(p) for p in players]
+    except TypeError:
+        return ["Unknown Player"]
+
+
+_redis_client: Optional[redis.Redis] = None
+
+
+def _get_redis() -> redis.Redis:
+    """Get the shared Redis client used for caching summaries."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.redis_url)
+    return _redis_client
 
 
 class SummaryGenerator:
     """Generate structured summaries from league data."""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, session_factory: async_sessionmaker = AsyncSessionLocal):
         self.db = db
+        # AsyncSession does not allow concurrent statements, so independent
+        # queries each get their own session from this factory
+        self.session_factory = session_factory
     
     async def generate_weekly_summary(
         self, 
@@ -103,48 +152,74 @@ class SummaryGenerator:
         if not league:
             raise ValueError(f"League {league_id} not found")
         
-        # Get performances
-        performances = await self._get_weekly_performances(league_id, week)
+        # Summaries are cached under a key that changes whenever the
+        # underlying league data is updated
+        cache_key = await self._get_cache_key(league, week)
+        summary = await self._get_cached_summary(cache_key)
+        if summary is not None:
+            return summary
         
-        # Calculate performance stats
-        highest_scorer = max(performances, key=lambda p: p.points_scored)
-        lowest_scorer = min(performances, key=lambda p: p.points_scored)
+        summary = await self._build_weekly_summary(league, week)
+        await self._cache_summary(cache_key, summary)
+        return summary
+    
+    async def _build_weekly_summary(self, league: League, week: int) -> WeeklySummary:
+        """Build a weekly summary from the database."""
+        league_id = league.id
         
-        # Find biggest blowout and closest matchup
-        blowouts = [(p, next((p2 for p2 in performances if p2.roster_id != p.roster_id and p2.opponent_name == p.team_name), None)) 
-                   for p in performances if p.win]
-        blowouts = [(p1, p2) for p1, p2 in blowouts if p2 is not None]
+        # Rosters are shared by every helper, so fetch them once
+        rosters = await self._get_rosters(self.db, league_id)
         
-        biggest_blowout = max(blowouts, key=lambda x: x[0].margin) if blowouts else (performances[0], performances[1])
-        closest_matchup = min(blowouts, key=lambda x: x[0].margin) if blowouts else (performances[0], performances[1])
+        # Fetch performances and transactions concurrently
+        async with self.session_factory() as s1, self.session_factory() as s2:
+            (performances, decided_matchups), transactions = await asyncio.gather(
+                self._get_weekly_performances(s1, league_id, week, rosters),
+                self._get_weekly_transactions(s2, league_id, week, rosters),
+            )
         
         # Get power rankings
-        power_rankings = await self._calculate_power_rankings(league_id, week)
+        power_rankings = self._calculate_power_rankings(rosters)
         
-        # Find biggest movements
-        climbers = [pr for pr in power_rankings if pr.movement > 0]
-        fallers = [pr for pr in power_rankings if pr.movement < 0]
+        # Calculate performance stats in a single pass
+        highest_scorer = lowest_scorer = performances[0]
+        total_points = 0.0
+        for p in performances:
+            total_points += p.points_scored
+            if p.points_scored > highest_scorer.points_scored:
+                highest_scorer = p
+            if p.points_scored < lowest_scorer.points_scored:
+                lowest_scorer = p
         
-        biggest_climber = max(climbers, key=lambda pr: pr.movement) if climbers else None
-        biggest_fall = max(fallers, key=lambda pr: abs(pr.movement)) if fallers else None
+        # Find biggest blowout and closest matchup in a single pass
+        if decided_matchups:
+            biggest_blowout = closest_matchup = decided_matchups[0]
+            for pair in decided_matchups:
+                if pair[0].margin > biggest_blowout[0].margin:
+                    biggest_blowout = pair
+                if pair[0].margin < closest_matchup[0].margin:
+                    closest_matchup = pair
+        else:
+            biggest_blowout = closest_matchup = (performances[0], performances[1])
         
-        # Get transactions
-        transactions = await self._get_weekly_transactions(league_id, week)
+        # Find biggest movements
+        biggest_climber = None
+        biggest_fall = None
+        for pr in power_rankings:
+            if pr.movement > 0 and (biggest_climber is None or pr.movement > biggest_climber.movement):
+                biggest_climber = pr
+            elif pr.movement < 0 and (biggest_fall is None or pr.movement < biggest_fall.movement):
+                biggest_fall = pr
         
         # Calculate transaction stats
         total_faab_spent = sum(t.faab_spent or 0 for t in transactions)
-        transaction_counts = {}
-        for t in transactions:
-            transaction_counts[t.owner_name] = transaction_counts.get(t.owner_name, 0) + 1
-        
-        most_active_trader = max(transaction_counts.items(), key=lambda x: x[1])[0] if transaction_counts else None
+        transaction_counts = Counter(t.owner_name for t in transactions)
+        most_active_trader = transaction_counts.most_common(1)[0][0] if transaction_counts else None
         
         # Calculate league stats
-        total_points = sum(p.points_scored for p in performances)
         average_score = total_points / len(performances) if performances else 0
         
         # Get playoff picture (top 6 teams by record, then by points)
-        sorted_rankings = sorted(power_rankings, key=lambda pr: pr.rank)
+        sorted_rankings = sorted(power_rankings, key=attrgetter('rank'))
         playoff_picture = [pr.team_name for pr in sorted_rankings[:6]]
         
         return WeeklySummary(
@@ -167,28 +242,101 @@ class SummaryGenerator:
             playoff_picture=playoff_picture
         )
     
+    async def _get_cache_key(self, league: League, week: int) -> str:
+        """Build a summary cache key from the latest update times of the league's data."""
+        result = await self.db.execute(
+            select(
+                select(func.max(Matchup.updated_at)).filter(
+                    Matchup.league_id == league.id,
+                    Matchup.week == week
+                ).scalar_subquery(),
+                select(func.max(Transaction.updated_at)).filter(
+                    Transaction.league_id == league.id,
+                    Transaction.week == week
+                ).scalar_subquery(),
+                select(func.max(Roster.updated_at)).filter(
+                    Roster.league_id == league.id
+                ).scalar_subquery(),
+            )
+        )
+        timestamps = [league.updated_at, *result.one()]
+        version = ":".join(str(int(ts.timestamp())) if ts else "0" for ts in timestamps)
+        # json: entries are msgspec JSON, never pickles from older releases
+        return f"weekly_summary:json:{league.id}:{week}:{version}"
+    
+    async def _get_cached_summary(self, cache_key: str) -> Optional[WeeklySummary]:
+        """Get a cached summary, or None on a miss or cache error."""
+        try:
+            data = await _get_redis().get(cache_key)
+            return msgspec.json.decode(data, type=WeeklySummary) if data else None
+        except Exception as e:
+            print(f"Error reading summary cache: {e}")
+            return None
+    
+    async def _cache_summary(self, cache_key: str, summary: WeeklySummary):
+        """Store a summary in the cache."""
+        try:
+            await _get_redis().set(
+                cache_key,
+                # Cached data only, never rendered text; the empty memo is
+                # kept in the payload since msgspec can't fill defaults on
+                # frozen dataclasses
+                msgspec.json.encode(replace(summary, rendered={})),
+                ex=settings.summary_cache_ttl_seconds
+            )
+        except Exception as e:
+            print(f"Error writing summary cache: {e}")
+    
+    async def _get_rosters(self, db: AsyncSession, league_id: int) -> Dict[str, Row]:
+        """Get all rosters for a league keyed by provider roster ID."""
+        # Read-only: select plain rows rather than hydrating ORM instances
+        result = await db.execute(
+            select(
+                Roster.provider_roster_id,
+                Roster.team_name,
+                Roster.owner_name,
+                Roster.wins,
+                Roster.losses,
+                Roster.ties,
+                Roster.points_for,
+                Roster.points_against,
+                Roster.power_rank_previous,
+            ).filter(Roster.league_id == league_id)
+        )
+        return {r.provider_roster_id: r for r in result.all()}
+    
     async def _get_weekly_performances(
         self, 
+        db: AsyncSession,
         league_id: int, 
-        week: int
-    ) -> List[WeeklyPerformance]:
-        """Get weekly performance data for all teams."""
+        week: int,
+        rosters: Dict[str, Row]
+    ) -> tuple[List[WeeklyPerformance], List[tuple[WeeklyPerformance, WeeklyPerformance]]]:
+        """
+        Get weekly performance data for all teams.
+        
+        Returns:
+            All team performances, plus (winner, loser) pairs for decided matchups
+        """
         # Get matchups for the week
-        result = await self.db.execute(
-            select(Matchup).filter(
+        result = await db.execute(
+            select(
+                Matchup.team1_roster_id,
+                Matchup.team2_roster_id,
+                Matchup.winner_roster_id,
+                Matchup.team1_points,
+                Matchup.team2_points,
+                Matchup.team1_projected,
+                Matchup.team2_projected,
+            ).filter(
                 Matchup.league_id == league_id,
                 Matchup.week == week
             )
         )
-        matchups = result.scalars().all()
-        
-        # Get rosters for team names
-        result = await self.db.execute(
-            select(Roster).filter(Roster.league_id == league_id)
-        )
-        rosters = {r.provider_roster_id: r for r in result.scalars().all()}
+        matchups = result.all()
         
         performances = []
+        decided_matchups = []
         
         for matchup in matchups:
             if not matchup.team2_roster_id:  # Bye week
@@ -202,7 +350,7 @@ class SummaryGenerator:
             
             # Team 1 performance
             team1_win = matchup.winner_roster_id == matchup.team1_roster_id
-            performances.append(WeeklyPerformance(
+            team1_perf = WeeklyPerformance(
                 roster_id=matchup.team1_roster_id,
                 team_name=team1_roster.team_name or f"Team {matchup.team1_roster_id}",
                 owner_name=team1_roster.owner_name or "Unknown",
@@ -212,11 +360,11 @@ class SummaryGenerator:
                 opponent_name=team2_roster.team_name or f"Team {matchup.team2_roster_id}",
                 opponent_points=matchup.team2_points or 0,
                 margin=abs((matchup.team1_points or 0) - (matchup.team2_points or 0))
-            ))
+            )
             
             # Team 2 performance
             team2_win = matchup.winner_roster_id == matchup.team2_roster_id
-            performances.append(WeeklyPerformance(
+            team2_perf = WeeklyPerformance(
                 roster_id=matchup.team2_roster_id,
                 team_name=team2_roster.team_name or f"Team {matchup.team2_roster_id}",
                 owner_name=team2_roster.owner_name or "Unknown",
@@ -226,36 +374,49 @@ class SummaryGenerator:
                 opponent_name=team1_roster.team_name or f"Team {matchup.team1_roster_id}",
                 opponent_points=matchup.team1_points or 0,
                 margin=abs((matchup.team2_points or 0) - (matchup.team1_points or 0))
-            ))
+            )
+            
+            performances.append(team1_perf)
+            performances.append(team2_perf)
+            
+            if team1_win:
+                decided_matchups.append((team1_perf, team2_perf))
+            elif team2_win:
+                decided_matchups.append((team2_perf, team1_perf))
         
-        return performances
+        return performances, decided_matchups
     
-    async def _calculate_power_rankings(
+    def _calculate_power_rankings(
         self, 
-        league_id: int, 
-        week: int
+        rosters: Dict[str, Row]
     ) -> List[PowerRankingEntry]:
         """Calculate power rankings for teams."""
-        # Get all rosters
-        result = await self.db.execute(
-            select(Roster).filter(Roster.league_id == league_id)
-        )
-        rosters = result.scalars().all()
-        
-        rankings = []
+        scored = []
         
-        for roster in rosters:
+        for roster in rosters.values():
             # Calculate power score (points for + win% * 100)
             total_games = roster.wins + roster.losses + roster.ties
             win_percentage = roster.wins / total_games if total_games > 0 else 0
-            power_score = roster.points_for + (win_percentage * 100)
-            
-            # Create ranking entry
-            current_rank = roster.power_rank or len(rosters)
+            scored.append((roster.points_for + (win_percentage * 100), roster))
+        
+        # Sort by power score, then build entries with their final rank
+        scored.sort(key=itemgetter(0), reverse=True)
+        
+        rankings = []
+        
+        for new_rank, (power_score, roster) in enumerate(scored, 1):
             previous_rank = roster.power_rank_previous
+            movement = (previous_rank or new_rank) - new_rank  # Positive = moved up
+            
+            if movement > 0:
+                trend = "up"
+            elif movement < 0:
+                trend = "down"
+            else:
+                trend = "same"
             
             rankings.append(PowerRankingEntry(
-                rank=current_rank,
+                rank=new_rank,
                 previous_rank=previous_rank,
                 roster_id=roster.provider_roster_id,
                 team_name=roster.team_name or f"Team {roster.provider_roster_id}",
@@ -264,49 +425,34 @@ class SummaryGenerator:
                 points_for=roster.points_for,
                 points_against=roster.points_against,
                 power_score=power_score,
-                trend="same",
-                movement=0
+                trend=trend,
+                movement=movement
             ))
         
-        # Sort by power score and assign ranks
-        rankings.sort(key=lambda r: r.power_score, reverse=True)
-        
-        for i, ranking in enumerate(rankings):
-            new_rank = i + 1
-            old_rank = ranking.previous_rank or new_rank
-            
-            ranking.rank = new_rank
-            ranking.movement = old_rank - new_rank  # Positive = moved up
-            
-            if ranking.movement > 0:
-                ranking.trend = "up"
-            elif ranking.movement < 0:
-                ranking.trend = "down"
-            else:
-                ranking.trend = "same"
-        
         return rankings
     
     async def _get_weekly_transactions(
         self, 
+        db: AsyncSession,
         league_id: int, 
-        week: int
+        week: int,
+        rosters: Dict[str, Row]
     ) -> List[TransactionSummary]:
         """Get transaction summaries for the week."""
         # Get transactions for the week
-        result = await self.db.execute(
-            select(Transaction).filter(
+        result = await db.execute(
+            select(
+                Transaction.roster_id,
+                Transaction.transaction_type,
+                Transaction.players_added,
+                Transaction.players_dropped,
+                Transaction.faab_bid,
+            ).filter(
                 Transaction.league_id == league_id,
                 Transaction.week == week
             )
         )
-        transactions = result.scalars().all()
-        
-        # Get rosters for team names
-        result = await self.db.execute(
-            select(Roster).filter(Roster.league_id == league_id)
-        )
-        rosters = {r.provider_roster_id: r for r in result.scalars().all()}
+        transactions = result.all()
         
         summaries = []
         
@@ -320,18 +466,10 @@ class SummaryGenerator:
             players_dropped = []
             
             if transaction.players_added:
-                try:
-                    added_data = json.loads(transaction.players_added)
-                    players_added = [self._format_player_name(p) for p in added_data]
-                except (json.JSONDecodeError, TypeError):
-                    players_added = ["Unknown Player"]
+                players_added = _parse_player_names(transaction.players_added)
             
             if transaction.players_dropped:
-                try:
-                    dropped_data = json.loads(transaction.players_dropped)
-                    players_dropped = [self._format_player_name(p) for p in dropped_data]
-                except (json.JSONDecodeError, TypeError):
-                    players_dropped = ["Unknown Player"]
+                players_dropped = _parse_player_names(transaction.players_dropped)
             
             # Generate notes
             notes = self._generate_transaction_notes(
@@ -353,15 +491,6 @@ class SummaryGenerator:
         
         return summaries
     
-    def _format_player_name(self, player_data: Any) -> str:
-        """Format player name from API data."""
-        if isinstance(player_data, dict):
-            return player_data.get('name', player_data.get('full_name', 'Unknown Player'))
-        elif isinstance(player_data, str):
-            return player_data
-        else:
-            return "Unknown Player"
-    
     def _generate_transaction_notes(
         self, 
         transaction_type: str, 
@@ -1,10 +1,10 @@
 """Text formatting and rendering for fantasy sports recaps."""
-from typing import Dict, Optional, Any
+from types import MappingProxyType
+from typing import AsyncIterator, ClassVar, Dict, Mapping, Optional, Any
 from datetime import datetime
-import asyncio
 
 import openai
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 
 from config import settings
 from ai_text.summary_generator import WeeklySummary
@@ -13,9 +13,25 @@ from ai_text.summary_generator import WeeklySummary
 class TextFormatter:
     """Format structured summaries into readable text."""
     
+    # Static decorations shared by every render
+    _SEP40 = "=" * 40
+    _SEP50 = "-" * 50
+    _FIRE_ROW = "🔥" * 10
+    _RANK_EMOJIS = ("🥇", "🥈", "🥉", "4️⃣", "5️⃣")
+    
+    # LLM rewrite instructions per persona
+    _PERSONA_INSTRUCTIONS: ClassVar[Mapping[str, str]] = MappingProxyType({
+        "witty": "Rewrite this fantasy football recap with wit, humor, and clever observations. Use puns, jokes, and playful roasting of teams. Keep it fun and entertaining.",
+        "professional": "Rewrite this fantasy football recap in a professional sports journalism style. Use proper analysis, statistics, and formal language.",
+        "roastmaster": "Rewrite this fantasy football recap with savage roasts and trash talk. Really go after the losing teams and bad performances. Be brutal but funny.",
+        "hype": "Rewrite this fantasy football recap with maximum energy and excitement. Use lots of caps, exclamation points, and hype up everything. Make it feel like a sports center highlight reel.",
+        "analyst": "Rewrite this fantasy football recap with deep fantasy analysis and insights. Focus on trends, predictions, and strategic observations."
+    })
+    _DEFAULT_PERSONA_INSTRUCTION = "Rewrite this fantasy football recap in an engaging, entertaining style."
+    
     def __init__(self):
         self.openai_client = openai.AsyncOpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
-        self.anthropic_client = Anthropic(api_key=settings.anthropic_api_key) if settings.anthropic_api_key else None
+        self.anthropic_client = AsyncAnthropic(api_key=settings.anthropic_api_key) if settings.anthropic_api_key else None
     
     def render_deterministic(self, summary: WeeklySummary, style: str = "standard") -> str:
         """
@@ -28,14 +44,23 @@ class TextFormatter:
         Returns:
             Formatted text ready for publishing
         """
+        # A summary is often rendered several times (LLM prompt base text,
+        # fallbacks, multiple channels), so memoize the result per style
+        cached = summary.rendered.get(style)
+        if cached is not None:
+            return cached
+        
         if style == "emoji":
-            return self._render_emoji_style(summary)
+            text = self._render_emoji_style(summary)
         elif style == "formal":
-            return self._render_formal_style(summary)
+            text = self._render_formal_style(summary)
         elif style == "casual":
-            return self._render_casual_style(summary)
+            text = self._render_casual_style(summary)
         else:
-            return self._render_standard_style(summary)
+            text = self._render_standard_style(summary)
+        
+        summary.rendered[style] = text
+        return text
     
     async def render_llm(
         self, 
@@ -68,66 +93,109 @@ class TextFormatter:
             # Fallback to deterministic if AI not available
             return self.render_deterministic(summary, style)
     
-    def _render_standard_style(self, summary: WeeklySummary) -> str:
-        """Standard, clean recap format."""
-        lines = []
-        
-        # Header
-        lines.append(f"📊 {summary.league_name} - Week {summary.week} Recap")
-        lines.append("=" * 40)
-        lines.append("")
+    async def render_llm_stream(
+        self, 
+        summary: WeeklySummary, 
+        style: str = "standard",
+        persona: Optional[str] = None,
+        provider: str = "openai"
+    ) -> AsyncIterator[str]:
+        """
+        Streaming variant of render_llm that yields text as it is generated.
         
-        # Weekly highlights
-        lines.append("🏆 WEEKLY HIGHLIGHTS")
-        lines.append(f"• High Score: {summary.highest_scorer.team_name} ({summary.highest_scorer.points_scored:.1f} pts)")
-        lines.append(f"• Low Score: {summary.lowest_scorer.team_name} ({summary.lowest_scorer.points_scored:.1f} pts)")
-        lines.append(f"• Biggest Blowout: {summary.biggest_blowout[0].team_name} over {summary.biggest_blowout[1].team_name} by {summary.biggest_blowout[0].margin:.1f}")
-        lines.append(f"• Closest Game: {summary.closest_matchup[0].team_name} vs {summary.closest_matchup[1].team_name} ({summary.closest_matchup[0].margin:.1f} pt margin)")
-        lines.append("")
+        Args:
+            summary: Weekly summary data
+            style: Base style template
+            persona: AI persona ("witty", "professional", "roastmaster", "hype")
+            provider: AI provider ("openai" or "anthropic")
+            
+        Yields:
+            Chunks of AI-generated text
+        """
+        base_text = self.render_deterministic(summary, style)
+        prompt = self._build_llm_prompt(summary, base_text, persona or style)
         
-        # Power Rankings
-        lines.append("📈 POWER RANKINGS")
-        for i, team in enumerate(summary.power_rankings[:5], 1):
-            movement = self._format_movement(team.movement)
-            lines.append(f"{i}. {team.team_name} ({team.record}) {movement}")
+        if provider == "anthropic" and self.anthropic_client:
+            async for chunk in self._stream_with_anthropic(prompt):
+                yield chunk
+        elif provider == "openai" and self.openai_client:
+            async for chunk in self._stream_with_openai(prompt):
+                yield chunk
+        else:
+            # Fallback to deterministic if AI not available
+            yield base_text
+    
+    def _render_standard_style(self, summary: WeeklySummary) -> str:
+        """Standard, clean recap format."""
+        rankings = "".join(
+            f"{i}. {team.team_name} ({team.record}) {self._format_movement(team.movement)}\n"
+            for i, team in enumerate(summary.power_rankings[:5], 1)
+        )
         
+        movers = ""
         if summary.biggest_climber:
-            lines.append(f"📈 Biggest Climber: {summary.biggest_climber.team_name} (+{summary.biggest_climber.movement})")
+            movers += f"📈 Biggest Climber: {summary.biggest_climber.team_name} (+{summary.biggest_climber.movement})\n"
         if summary.biggest_fall:
-            lines.append(f"📉 Biggest Fall: {summary.biggest_fall.team_name} ({summary.biggest_fall.movement})")
-        lines.append("")
-        
-        # Waiver Wire Activity
-        if summary.transactions:
-            lines.append("💰 WAIVER WIRE ACTIVITY")
-            lines.append(f"• Total FAAB Spent: ${summary.total_faab_spent}")
-            if summary.most_active_trader:
-                lines.append(f"• Most Active: {summary.most_active_trader}")
-            
-            # Top transactions
-            for trans in summary.transactions[:3]:
-                lines.append(f"• {trans.owner_name}: {trans.notes}")
-            lines.append("")
-        
-        # League Stats
-        lines.append("📊 LEAGUE STATS")
-        lines.append(f"• League Average: {summary.average_score:.1f} pts")
-        lines.append(f"• Total Points: {summary.total_points:.1f}")
-        lines.append("")
-        
-        # Playoff Picture
-        lines.append("🏈 PLAYOFF PICTURE")
-        for i, team in enumerate(summary.playoff_picture, 1):
-            lines.append(f"{i}. {team}")
-        
-        return "\n".join(lines)
+            movers += f"📉 Biggest Fall: {summary.biggest_fall.team_name} ({summary.biggest_fall.movement})\n"
+        
+        playoff_picture = "".join(
+            f"\n{i}. {team}" for i, team in enumerate(summary.playoff_picture, 1)
+        )
+        
+        return (
+            # Header
+            f"📊 {summary.league_name} - Week {summary.week} Recap\n"
+            f"{self._SEP40}\n"
+            "\n"
+            # Weekly highlights
+            "🏆 WEEKLY HIGHLIGHTS\n"
+            f"• High Score: {summary.highest_scorer.team_name} ({summary.highest_scorer.points_scored:.1f} pts)\n"
+            f"• Low Score: {summary.lowest_scorer.team_name} ({summary.lowest_scorer.points_scored:.1f} pts)\n"
+            f"• Biggest Blowout: {summary.biggest_blowout[0].team_name} over {summary.biggest_blowout[1].team_name} by {summary.biggest_blowout[0].margin:.1f}\n"
+            f"• Closest Game: {summary.closest_matchup[0].team_name} vs {summary.closest_matchup[1].team_name} ({summary.closest_matchup[0].margin:.1f} pt margin)\n"
+            "\n"
+            # Power Rankings
+            "📈 POWER RANKINGS\n"
+            f"{rankings}"
+            f"{movers}"
+            "\n"
+            # Waiver Wire Activity
+            f"{self._render_standard_transactions(summary)}"
+            # League Stats
+            "📊 LEAGUE STATS\n"
+            f"• League Average: {summary.average_score:.1f} pts\n"
+            f"• Total Points: {summary.total_points:.1f}\n"
+            "\n"
+            # Playoff Picture
+            f"🏈 PLAYOFF PICTURE{playoff_picture}"
+        )
+    
+    def _render_standard_transactions(self, summary: WeeklySummary) -> str:
+        """Waiver wire section of the standard format (empty if no activity)."""
+        if not summary.transactions:
+            return ""
+        
+        most_active = f"• Most Active: {summary.most_active_trader}\n" if summary.most_active_trader else ""
+        
+        # Top transactions
+        top_transactions = "".join(
+            f"• {trans.owner_name}: {trans.notes}\n" for trans in summary.transactions[:3]
+        )
+        
+        return (
+            "💰 WAIVER WIRE ACTIVITY\n"
+            f"• Total FAAB Spent: ${summary.total_faab_spent}\n"
+            f"{most_active}"
+            f"{top_transactions}"
+            "\n"
+        )
     
     def _render_emoji_style(self, summary: WeeklySummary) -> str:
         """Fun emoji-heavy format."""
         lines = []
         
         lines.append(f"🏈 {summary.league_name} Week {summary.week} 🏈")
-        lines.append("🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥")
+        lines.append(self._FIRE_ROW)
         lines.append("")
         
         # Highlights with emojis
@@ -146,22 +214,20 @@ class TextFormatter:
         
         # Power Rankings with emojis
         lines.append("👑 POWER RANKINGS 👑")
-        emojis = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"]
-        for i, team in enumerate(summary.power_rankings[:5]):
-            emoji = emojis[i] if i < len(emojis) else f"{i+1}️⃣"
-            movement_emoji = "📈" if team.movement > 0 else "📉" if team.movement < 0 else "➡️"
-            lines.append(f"{emoji} {team.team_name} {team.record} {movement_emoji}")
+        lines.extend(
+            f"{emoji} {team.team_name} {team.record} {'📈' if team.movement > 0 else '📉' if team.movement < 0 else '➡️'}"
+            for emoji, team in zip(self._RANK_EMOJIS, summary.power_rankings[:5])
+        )
         lines.append("")
         
         # Transactions with emojis
         if summary.transactions:
             lines.append("💰 WAIVER WIRE MADNESS 💰")
             lines.append(f"Total FAAB: ${summary.total_faab_spent} 💸")
-            for trans in summary.transactions[:3]:
-                if trans.faab_spent and trans.faab_spent > 50:
-                    lines.append(f"🤑 {trans.owner_name}: {trans.notes}")
-                else:
-                    lines.append(f"💰 {trans.owner_name}: {trans.notes}")
+            lines.extend(
+                f"{'🤑' if trans.faab_spent and trans.faab_spent > 50 else '💰'} {trans.owner_name}: {trans.notes}"
+                for trans in summary.transactions[:3]
+            )
         
         return "\n".join(lines)
     
@@ -172,7 +238,7 @@ class TextFormatter:
         lines.append(f"{summary.league_name}")
         lines.append(f"Week {summary.week} Fantasy Football Report")
         lines.append(f"Season {summary.season}")
-        lines.append("-" * 50)
+        lines.append(self._SEP50)
         lines.append("")
         
         lines.append("EXECUTIVE SUMMARY")
@@ -188,8 +254,10 @@ class TextFormatter:
         lines.append("")
         
         lines.append("CURRENT STANDINGS AND POWER RANKINGS")
-        for i, team in enumerate(summary.power_rankings, 1):
-            lines.append(f"{i}. {team.team_name} - Record: {team.record}, Points For: {team.points_for:.1f}")
+        lines.extend(
+            f"{i}. {team.team_name} - Record: {team.record}, Points For: {team.points_for:.1f}"
+            for i, team in enumerate(summary.power_rankings, 1)
+        )
         lines.append("")
         
         if summary.transactions:
@@ -224,20 +292,16 @@ class TextFormatter:
         lines.append("")
         
         lines.append("Current power rankings (don't @ me):")
-        for i, team in enumerate(summary.power_rankings[:5], 1):
-            movement = ""
-            if team.movement > 0:
-                movement = f" (up {team.movement})"
-            elif team.movement < 0:
-                movement = f" (down {abs(team.movement)})"
-            lines.append(f"{i}. {team.team_name} {team.record}{movement}")
+        lines.extend(
+            f"{i}. {team.team_name} {team.record}{self._format_casual_movement(team.movement)}"
+            for i, team in enumerate(summary.power_rankings[:5], 1)
+        )
         lines.append("")
         
         if summary.transactions:
             lines.append("Waiver wire was BUSY this week:")
             lines.append(f"Y'all spent ${summary.total_faab_spent} total on free agents 💸")
-            for trans in summary.transactions[:3]:
-                lines.append(f"• {trans.notes}")
+            lines.extend(f"• {trans.notes}" for trans in summary.transactions[:3])
         
         return "\n".join(lines)
     
@@ -250,17 +314,18 @@ class TextFormatter:
         else:
             return "(→)"
     
+    def _format_casual_movement(self, movement: int) -> str:
+        """Format power ranking movement for the casual style."""
+        if movement > 0:
+            return f" (up {movement})"
+        elif movement < 0:
+            return f" (down {abs(movement)})"
+        else:
+            return ""
+    
     def _build_llm_prompt(self, summary: WeeklySummary, base_text: str, persona: str) -> str:
         """Build prompt for LLM rendering."""
-        persona_instructions = {
-            "witty": "Rewrite this fantasy football recap with wit, humor, and clever observations. Use puns, jokes, and playful roasting of teams. Keep it fun and entertaining.",
-            "professional": "Rewrite this fantasy football recap in a professional sports journalism style. Use proper analysis, statistics, and formal language.",
-            "roastmaster": "Rewrite this fantasy football recap with savage roasts and trash talk. Really go after the losing teams and bad performances. Be brutal but funny.",
-            "hype": "Rewrite this fantasy football recap with maximum energy and excitement. Use lots of caps, exclamation points, and hype up everything. Make it feel like a sports center highlight reel.",
-            "analyst": "Rewrite this fantasy football recap with deep fantasy analysis and insights. Focus on trends, predictions, and strategic observations."
-        }
-        
-        instruction = persona_instructions.get(persona, "Rewrite this fantasy football recap in an engaging, entertaining style.")
+        instruction = self._PERSONA_INSTRUCTIONS.get(persona, self._DEFAULT_PERSONA_INSTRUCTION)
         
         return f"""
 {instruction}
@@ -290,11 +355,34 @@ Rewritten recap:
             print(f"Error with OpenAI rendering: {e}")
             return "Error generating AI recap"
     
+    async def _stream_with_openai(self, prompt: str) -> AsyncIterator[str]:
+        """Stream text from OpenAI as it is generated."""
+        started = False
+        try:
+            response = await self.openai_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are a fantasy football expert who writes engaging recaps for league group chats."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=500,
+                temperature=0.8,
+                stream=True
+            )
+            async for chunk in response:
+                content = chunk.choices[0].delta.content
+                if content:
+                    started = True
+                    yield content
+        except Exception as e:
+            print(f"Error with OpenAI streaming: {e}")
+            if not started:
+                yield "Error generating AI recap"
+    
     async def _render_with_anthropic(self, prompt: str) -> str:
         """Render text using Anthropic Claude."""
         try:
-            message = await asyncio.to_thread(
-                self.anthropic_client.messages.create,
+            message = await self.anthropic_client.messages.create(
                 model="claude-3-haiku-20240307",
                 max_tokens=500,
                 temperature=0.8,
@@ -306,3 +394,23 @@ Rewritten recap:
         except Exception as e:
             print(f"Error with Anthropic rendering: {e}")
             return "Error generating AI recap"
+    
+    async def _stream_with_anthropic(self, prompt: str) -> AsyncIterator[str]:
+        """Stream text from Anthropic Claude as it is generated."""
+        started = False
+        try:
+            async with self.anthropic_client.messages.stream(
+                model="claude-3-haiku-20240307",
+                max_tokens=500,
+                temperature=0.8,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            ) as stream:
+                async for text in stream.text_stream:
+                    started = True
+                    yield text
+        except Exception as e:
+            print(f"Error with Anthropic streaming: {e}")
+            if not started:
+                yield "Error generating AI recap"
@@ -1,18 +1,18 @@
 """Admin routes for managing leagues and running recaps."""
+from datetime import datetime
 from typing import Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from pydantic import BaseModel
+from sqlalchemy import Row, bindparam, insert, select
+from sqlalchemy.orm import raiseload, selectinload
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 
 from database.connection import get_db
 from models.user import User
 from models.league import League, ProviderType
 from api.routes.auth import get_current_user
-from services.recap_service import run_power_rankings, run_waiver_recap
-from ingestors.sleeper_ingestor import ingest_sleeper_league
-from ingestors.yahoo_ingestor import ingest_yahoo_leagues
+from schedulers.tasks import sync_specific_league, generate_manual_recap
 
 router = APIRouter()
 
@@ -47,6 +47,8 @@ class LeagueUpdate(BaseModel):
 
 class LeagueResponse(BaseModel):
     """League response model."""
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     provider: ProviderType
     provider_league_id: str
@@ -60,7 +62,36 @@ class LeagueResponse(BaseModel):
     enable_llm_rendering: bool
     ai_persona_style: Optional[str]
     is_active: bool
-    last_sync_at: Optional[str]
+    last_sync_at: Optional[datetime]
+
+
+_LEAGUE_LIST_ADAPTER = TypeAdapter(List[LeagueResponse])
+
+# Fixed acknowledgement bodies, encoded once
+_LEAGUE_DELETED = b'{"message":"League deleted successfully"}'
+_LEAGUE_SYNC_STARTED = b'{"message":"League sync started"}'
+_POWER_RANKINGS_STARTED = b'{"message":"Power rankings recap started"}'
+_WAIVER_RECAP_STARTED = b'{"message":"Waiver recap started"}'
+
+# Statements built once at import; routes only bind parameters
+# LeagueResponse only reads columns; fail loudly rather than lazy-load per row
+_LEAGUES_BY_OWNER = select(League).filter(
+    League.owner_id == bindparam("owner_id")
+).options(raiseload("*"))
+_EXISTING_LEAGUE = select(League).filter(
+    League.owner_id == bindparam("owner_id"),
+    League.provider == bindparam("provider"),
+    League.provider_league_id == bindparam("provider_league_id"),
+    League.season == bindparam("season")
+)
+# Just the columns needed to authorize and enqueue sync/recap jobs
+_RECAP_META = select(
+    League.id,
+    League.enable_power_rankings,
+    League.enable_waiver_recaps,
+    League.provider,
+    League.provider_league_id
+).filter(League.id == bindparam("league_id"), League.owner_id == bindparam("owner_id"))
 
 
 class RecapRequest(BaseModel):
@@ -69,6 +100,19 @@ class RecapRequest(BaseModel):
     week: Optional[int] = None  # If not provided, uses current week
 
 
+async def _get_league_meta(db: AsyncSession, league_id: int, owner_id: int) -> Row:
+    """Get job metadata for a league owned by the user, or raise 404."""
+    result = await db.execute(_RECAP_META, {"league_id": league_id, "owner_id": owner_id})
+    league = result.first()
+    
+    if league is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="League not found"
+        )
+    return league
+
+
 @router.post("/leagues", response_model=LeagueResponse)
 async def create_league(
     league_data: LeagueCreate,
@@ -78,12 +122,13 @@ async def create_league(
     """Create a new league for the current user."""
     # Check if league already exists for this user
     result = await db.execute(
-        select(League).filter(
-            League.owner_id == current_user.id,
-            League.provider == league_data.provider,
-            League.provider_league_id == league_data.provider_league_id,
-            League.season == league_data.season
-        )
+        _EXISTING_LEAGUE,
+        {
+            "owner_id": current_user.id,
+            "provider": league_data.provider,
+            "provider_league_id": league_data.provider_league_id,
+            "season": league_data.season,
+        }
     )
     existing_league = result.scalar_one_or_none()
     
@@ -93,41 +138,25 @@ async def create_league(
             detail="League already exists for this user"
         )
     
-    # Create new league
-    new_league = League(
-        owner_id=current_user.id,
-        provider=league_data.provider,
-        provider_league_id=league_data.provider_league_id,
-        name=league_data.name,
-        season=league_data.season,
-        num_teams=0,  # Will be updated during ingestion
-        groupme_bot_id=league_data.groupme_bot_id,
-        enable_power_rankings=league_data.enable_power_rankings,
-        enable_waiver_recaps=league_data.enable_waiver_recaps,
-        enable_llm_rendering=league_data.enable_llm_rendering,
-        ai_persona_style=league_data.ai_persona_style,
+    # Create new league, reading server-generated columns back via RETURNING
+    new_league = await db.scalar(
+        insert(League).values(
+            owner_id=current_user.id,
+            provider=league_data.provider,
+            provider_league_id=league_data.provider_league_id,
+            name=league_data.name,
+            season=league_data.season,
+            num_teams=0,  # Will be updated during ingestion
+            groupme_bot_id=league_data.groupme_bot_id,
+            enable_power_rankings=league_data.enable_power_rankings,
+            enable_waiver_recaps=league_data.enable_waiver_recaps,
+            enable_llm_rendering=league_data.enable_llm_rendering,
+            ai_persona_style=league_data.ai_persona_style,
+        ).returning(League)
     )
-    
-    db.add(new_league)
     await db.commit()
-    await db.refresh(new_league)
     
-    return LeagueResponse(
-        id=new_league.id,
-        provider=new_league.provider,
-        provider_league_id=new_league.provider_league_id,
-        name=new_league.name,
-        season=new_league.season,
-        week=new_league.week,
-        num_teams=new_league.num_teams,
-        groupme_bot_id=new_league.groupme_bot_id,
-        enable_power_rankings=new_league.enable_power_rankings,
-        enable_waiver_recaps=new_league.enable_waiver_recaps,
-        enable_llm_rendering=new_league.enable_llm_rendering,
-        ai_persona_style=new_league.ai_persona_style,
-        is_active=new_league.is_active,
-        last_sync_at=new_league.last_sync_at.isoformat() if new_league.last_sync_at else None
-    )
+    return LeagueResponse.model_validate(new_league)
 
 
 @router.get("/leagues", response_model=List[LeagueResponse])
@@ -136,30 +165,10 @@ async def get_user_leagues(
     db: AsyncSession = Depends(get_db)
 ):
     """Get all leagues for the current user."""
-    result = await db.execute(
-        select(League).filter(League.owner_id == current_user.id)
-    )
+    result = await db.execute(_LEAGUES_BY_OWNER, {"owner_id": current_user.id})
     leagues = result.scalars().all()
     
-    return [
-        LeagueResponse(
-            id=league.id,
-            provider=league.provider,
-            provider_league_id=league.provider_league_id,
-            name=league.name,
-            season=league.season,
-            week=league.week,
-            num_teams=league.num_teams,
-            groupme_bot_id=league.groupme_bot_id,
-            enable_power_rankings=league.enable_power_rankings,
-            enable_waiver_recaps=league.enable_waiver_recaps,
-            enable_llm_rendering=league.enable_llm_rendering,
-            ai_persona_style=league.ai_persona_style,
-            is_active=league.is_active,
-            last_sync_at=league.last_sync_at.isoformat() if league.last_sync_at else None
-        )
-        for league in leagues
-    ]
+    return _LEAGUE_LIST_ADAPTER.validate_python(leagues)
 
 
 @router.patch("/leagues/{league_id}", response_model=LeagueResponse)
@@ -170,15 +179,9 @@ async def update_league(
     db: AsyncSession = Depends(get_db)
 ):
     """Update league settings."""
-    result = await db.execute(
-        select(League).filter(
-            League.id == league_id,
-            League.owner_id == current_user.id
-        )
-    )
-    league = result.scalar_one_or_none()
+    league = await db.get(League, league_id)
     
-    if not league:
+    if league is None or league.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="League not found"
@@ -190,24 +193,8 @@ async def update_league(
         setattr(league, field, value)
     
     await db.commit()
-    await db.refresh(league)
     
-    return LeagueResponse(
-        id=league.id,
-        provider=league.provider,
-        provider_league_id=league.provider_league_id,
-        name=league.name,
-        season=league.season,
-        week=league.week,
-        num_teams=league.num_teams,
-        groupme_bot_id=league.groupme_bot_id,
-        enable_power_rankings=league.enable_power_rankings,
-        enable_waiver_recaps=league.enable_waiver_recaps,
-        enable_llm_rendering=league.enable_llm_rendering,
-        ai_persona_style=league.ai_persona_style,
-        is_active=league.is_active,
-        last_sync_at=league.last_sync_at.isoformat() if league.last_sync_at else None
-    )
+    return LeagueResponse.model_validate(league)
 
 
 @router.delete("/leagues/{league_id}")
@@ -217,15 +204,18 @@ async def delete_league(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a league."""
-    result = await db.execute(
-        select(League).filter(
-            League.id == league_id,
-            League.owner_id == current_user.id
-        )
+    # Load cascaded children in one query each rather than per collection access
+    league = await db.get(
+        League,
+        league_id,
+        options=[
+            selectinload(League.rosters),
+            selectinload(League.matchups),
+            selectinload(League.transactions),
+        ]
     )
-    league = result.scalar_one_or_none()
     
-    if not league:
+    if league is None or league.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="League not found"
@@ -234,61 +224,32 @@ async def delete_league(
     await db.delete(league)
     await db.commit()
     
-    return {"message": "League deleted successfully"}
+    return Response(content=_LEAGUE_DELETED, media_type="application/json")
 
 
 @router.post("/leagues/{league_id}/sync")
 async def sync_league_data(
     league_id: int,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Manually sync league data from provider."""
-    result = await db.execute(
-        select(League).filter(
-            League.id == league_id,
-            League.owner_id == current_user.id
-        )
-    )
-    league = result.scalar_one_or_none()
-    
-    if not league:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="League not found"
-        )
+    league = await _get_league_meta(db, league_id, current_user.id)
     
-    # Add background task to sync data
-    if league.provider == ProviderType.SLEEPER:
-        background_tasks.add_task(ingest_sleeper_league, league.provider_league_id)
-    elif league.provider == ProviderType.YAHOO:
-        background_tasks.add_task(ingest_yahoo_leagues, current_user.id)
+    # Queue sync on a Celery worker
+    sync_specific_league.delay(league.id, league.provider.value, league.provider_league_id)
     
-    return {"message": "League sync started"}
+    return Response(content=_LEAGUE_SYNC_STARTED, media_type="application/json")
 
 
 @router.post("/recaps/power-rankings")
 async def run_manual_power_rankings(
     request: RecapRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Manually run power rankings recap for a league."""
-    result = await db.execute(
-        select(League).filter(
-            League.id == request.league_id,
-            League.owner_id == current_user.id
-        )
-    )
-    league = result.scalar_one_or_none()
-    
-    if not league:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="League not found"
-        )
+    league = await _get_league_meta(db, request.league_id, current_user.id)
     
     if not league.enable_power_rankings:
         raise HTTPException(
@@ -296,33 +257,20 @@ async def run_manual_power_rankings(
             detail="Power rankings are disabled for this league"
         )
     
-    # Add background task to run power rankings
-    background_tasks.add_task(run_power_rankings, league.id, request.week)
+    # Queue power rankings on a Celery worker
+    generate_manual_recap.delay(league.id, "power_rankings", request.week)
     
-    return {"message": "Power rankings recap started"}
+    return Response(content=_POWER_RANKINGS_STARTED, media_type="application/json")
 
 
 @router.post("/recaps/waiver-recap")
 async def run_manual_waiver_recap(
     request: RecapRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Manually run waiver recap for a league."""
-    result = await db.execute(
-        select(League).filter(
-            League.id == request.league_id,
-            League.owner_id == current_user.id
-        )
-    )
-    league = result.scalar_one_or_none()
-    
-    if not league:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="League not found"
-        )
+    league = await _get_league_meta(db, request.league_id, current_user.id)
     
     if not league.enable_waiver_recaps:
         raise HTTPException(
@@ -330,7 +278,7 @@ async def run_manual_waiver_recap(
             detail="Waiver recaps are disabled for this league"
         )
     
-    # Add background task to run waiver recap
-    background_tasks.add_task(run_waiver_recap, league.id, request.week)
+    # Queue waiver recap on a Celery worker
+    generate_manual_recap.delay(league.id, "waiver_recap", request.week)
     
-    return {"message": "Waiver recap started"}
+    return Response(content=_WAIVER_RECAP_STARTED, media_type="application/json")
@@ -1,16 +1,21 @@
 """Authentication routes for Yahoo OAuth and Sleeper integration."""
-import json
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 
+import httpx
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import selectinload
 from authlib.integrations.starlette_client import OAuth
 from authlib.integrations.starlette_client import OAuthError
-from jose import JWTError, jwt
+import jwt
+from jwt import PyJWTError
 from pydantic import BaseModel
 
 from config import settings
@@ -21,6 +26,35 @@ from models.league import League, ProviderType
 router = APIRouter()
 security = HTTPBearer()
 
+# Bound once at import; read on every authenticated request
+_SECRET_KEY = settings.secret_key
+_ALGORITHMS = [settings.algorithm]
+_ACCESS_TOKEN_EXPIRE_SECONDS = settings.access_token_expire_minutes * 60
+
+
+class _SharedTransport(httpx.AsyncHTTPTransport):
+    """
+    Connection pool shared by the short-lived clients authlib creates per call.
+    
+    Authlib closes its client after every OAuth request, which would also close
+    the pool; closing is deferred to application shutdown instead.
+    """
+    
+    async def __aexit__(self, exc_type=None, exc_value=None, traceback=None):
+        pass
+    
+    async def aclose(self):
+        pass
+    
+    async def shutdown(self):
+        """Close pooled connections."""
+        await super().aclose()
+
+
+_YAHOO_TRANSPORT = _SharedTransport(
+    limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30)
+)
+
 # OAuth configuration
 oauth = OAuth()
 oauth.register(
@@ -28,10 +62,15 @@ oauth.register(
     client_id=settings.yahoo_client_id,
     client_secret=settings.yahoo_client_secret,
     server_metadata_url='https://api.login.yahoo.com/.well-known/openid_connect',
-    client_kwargs={'scope': 'openid email profile'}
+    client_kwargs={'scope': 'openid email profile', 'transport': _YAHOO_TRANSPORT}
 )
 
 
+async def close_oauth_connections():
+    """Close pooled Yahoo OAuth connections on shutdown."""
+    await _YAHOO_TRANSPORT.shutdown()
+
+
 class SleeperLeagueRequest(BaseModel):
     """Request model for adding Sleeper leagues."""
     league_ids: list[str]
@@ -57,15 +96,28 @@ class UserResponse(BaseModel):
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token."""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    lifetime = int(expires_delta.total_seconds()) if expires_delta else _ACCESS_TOKEN_EXPIRE_SECONDS
+    to_encode["exp"] = int(time.time()) + lifetime
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY, algorithm=_ALGORITHMS[0])
     return encoded_jwt
 
 
+@lru_cache(maxsize=4096)
+def _verify_token(token: str) -> tuple[int, Optional[int]]:
+    """
+    Verify a JWT and return its (user_id, exp) claims.
+    
+    Results are memoized per token so repeat requests skip signature
+    verification; callers must still check expiry on every use.
+    Invalid tokens raise and are therefore never cached.
+    """
+    payload = jwt.decode(token, _SECRET_KEY, algorithms=_ALGORITHMS)
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise jwt.InvalidTokenError("Token has no subject")
+    return int(user_id), payload.get("exp")
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
@@ -78,15 +130,14 @@ async def get_current_user(
     )
     
     try:
-        payload = jwt.decode(credentials.credentials, settings.secret_key, algorithms=[settings.algorithm])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        user_id, exp = _verify_token(credentials.credentials)
+    except (PyJWTError, ValueError):
         raise credentials_exception
     
-    result = await db.execute(select(User).filter(User.id == user_id))
-    user = result.scalar_one_or_none()
+    if exp is not None and exp <= time.time():
+        raise credentials_exception
+    
+    user = await db.get(User, user_id)
     if user is None:
         raise credentials_exception
     return user
@@ -127,36 +178,39 @@ async def yahoo_callback(request: Request, db: AsyncSession = Depends(get_db)):
     email = user_info.get('email')
     username = user_info.get('preferred_username') or user_info.get('nickname')
     
-    # Find or create user
-    result = await db.execute(select(User).filter(User.yahoo_user_id == yahoo_user_id))
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        user = User(
-            yahoo_user_id=yahoo_user_id,
-            email=email,
-            username=username,
-        )
-        db.add(user)
-    else:
-        # Update existing user
-        user.email = email or user.email
-        user.username = username or user.username
-    
     # Store OAuth tokens
-    user.yahoo_access_token = token['access_token']
-    user.yahoo_refresh_token = token.get('refresh_token')
+    token_values = {
+        "yahoo_access_token": token['access_token'],
+        "yahoo_refresh_token": token.get('refresh_token'),
+    }
     if 'expires_in' in token:
-        user.yahoo_token_expires_at = datetime.utcnow() + timedelta(seconds=token['expires_in'])
+        token_values["yahoo_token_expires_at"] = datetime.fromtimestamp(
+            time.time() + token['expires_in'], tz=timezone.utc
+        )
+    
+    # Find or create user in a single INSERT ... ON CONFLICT ... RETURNING
+    stmt = insert(User).values(
+        yahoo_user_id=yahoo_user_id,
+        email=email or None,
+        username=username or None,
+        **token_values
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.yahoo_user_id],
+        set_={
+            # Keep existing profile fields when Yahoo doesn't send them
+            "email": func.coalesce(stmt.excluded.email, User.email),
+            "username": func.coalesce(stmt.excluded.username, User.username),
+            "updated_at": func.now(),
+            **{key: stmt.excluded[key] for key in token_values},
+        }
+    ).returning(User)
     
+    user = await db.scalar(stmt, execution_options={"populate_existing": True})
     await db.commit()
-    await db.refresh(user)
     
     # Create access token
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
-    )
+    access_token = create_access_token(data={"sub": str(user.id)})
     
     # In a real app, you'd redirect to your frontend with the token
     return {"access_token": access_token, "token_type": "bearer", "user": user}
@@ -177,20 +231,15 @@ async def add_sleeper_leagues(
                 detail="League ID cannot be empty"
             )
     
-    # Store league IDs as JSON
-    current_user.sleeper_leagues = json.dumps(request.league_ids)
+    current_user.sleeper_leagues = request.league_ids
     await db.commit()
-    await db.refresh(current_user)
-    
-    # Convert back to list for response
-    sleeper_leagues = json.loads(current_user.sleeper_leagues) if current_user.sleeper_leagues else []
     
     return UserResponse(
         id=current_user.id,
         username=current_user.username,
         email=current_user.email,
         yahoo_user_id=current_user.yahoo_user_id,
-        sleeper_leagues=sleeper_leagues,
+        sleeper_leagues=request.league_ids,
         timezone=current_user.timezone,
         enable_llm_rendering=current_user.enable_llm_rendering
     )
@@ -199,14 +248,12 @@ async def add_sleeper_leagues(
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information."""
-    sleeper_leagues = json.loads(current_user.sleeper_leagues) if current_user.sleeper_leagues else []
-    
     return UserResponse(
         id=current_user.id,
         username=current_user.username,
         email=current_user.email,
         yahoo_user_id=current_user.yahoo_user_id,
-        sleeper_leagues=sleeper_leagues,
+        sleeper_leagues=current_user.sleeper_leagues or [],
         timezone=current_user.timezone,
         enable_llm_rendering=current_user.enable_llm_rendering
     )
@@ -224,6 +271,16 @@ async def delete_account(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete user account and all associated data."""
+    # Eager-load the delete cascade so it doesn't issue queries per league
+    await db.execute(
+        select(User).filter(User.id == current_user.id).options(
+            selectinload(User.leagues).options(
+                selectinload(League.rosters),
+                selectinload(League.matchups),
+                selectinload(League.transactions),
+            )
+        )
+    )
     await db.delete(current_user)
     await db.commit()
     return {"message": "Account deleted successfully"}
@@ -1,19 +1,90 @@
 """Webhook routes for external integrations."""
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from pydantic import BaseModel
+from sqlalchemy import Row, bindparam, select
 from typing import Dict, Any, Optional
+import msgspec
+import redis.asyncio as redis
+from celery import group
+from celery.canvas import Signature
 
+from config import settings
 from database.connection import get_db
 from models.league import League, ProviderType
-from services.recap_service import run_power_rankings, run_waiver_recap
-from ingestors.sleeper_ingestor import ingest_sleeper_league
+from schedulers.tasks import SLEEPER_INGEST_LOCK_KEY, sync_specific_league, generate_manual_recap
 
 router = APIRouter()
 
+# Fixed acknowledgement bodies, encoded once
+_GENERIC_PROCESSED = b'{"status":"success","message":"Generic webhook processed"}'
+_HEALTHY = b'{"status":"healthy","service":"webhooks"}'
+
+# Statements built once at import; routes only bind parameters. Webhooks
+# just check a few flags before enqueueing work, so read plain rows rather
+# than tracking League instances in the session.
+_WEBHOOK_LEAGUE_COLUMNS = (
+    League.id,
+    League.name,
+    League.provider,
+    League.provider_league_id,
+    League.enable_power_rankings,
+    League.enable_waiver_recaps,
+)
+_ACTIVE_LEAGUE = select(*_WEBHOOK_LEAGUE_COLUMNS).filter(
+    League.provider == bindparam("provider"),
+    League.provider_league_id == bindparam("provider_league_id"),
+    League.is_active.is_(True)
+)
+_ANY_ACTIVE_LEAGUE = select(*_WEBHOOK_LEAGUE_COLUMNS).filter(
+    League.provider_league_id == bindparam("provider_league_id"),
+    League.is_active.is_(True)
+)
+
+_redis_client: Optional[redis.Redis] = None
+
 
-class SleeperWebhookPayload(BaseModel):
+def _get_redis() -> redis.Redis:
+    """Get the shared Redis client used for ingestion locks."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.redis_url)
+    return _redis_client
+
+
+async def _queue_sleeper_sync(league: Row, *jobs: Signature):
+    """
+    Queue a Sleeper sync unless one is already pending for the league.
+    
+    Bursts of webhook events collapse into a single ingestion; the lock holds
+    a token that is handed to the sync task, which releases the lock only if
+    it still owns it when it finishes. Otherwise it expires after the TTL.
+    Any additional jobs are published in the same group so workers run them
+    in parallel with the sync.
+    """
+    lock_token = uuid.uuid4().hex
+    try:
+        acquired = await _get_redis().set(
+            SLEEPER_INGEST_LOCK_KEY.format(league.provider_league_id),
+            lock_token,
+            nx=True,
+            ex=settings.ingest_lock_ttl_seconds
+        )
+    except Exception as e:
+        print(f"Error acquiring ingest lock for league {league.provider_league_id}: {e}")
+        acquired = True
+    
+    if acquired:
+        jobs += (sync_specific_league.s(
+            league.id, ProviderType.SLEEPER.value, league.provider_league_id, lock_token
+        ),)
+    if jobs:
+        group(jobs).apply_async()
+
+
+class SleeperWebhookPayload(msgspec.Struct):
     """Sleeper webhook payload model."""
     type: str  # "waiver", "trade", "transaction", etc.
     league_id: str
@@ -23,7 +94,26 @@ class SleeperWebhookPayload(BaseModel):
     data: Optional[Dict[str, Any]] = None
 
 
-class GenericWebhookPayload(BaseModel):
+_SLEEPER_PAYLOAD_DECODER = msgspec.json.Decoder(SleeperWebhookPayload)
+
+
+async def _decode_payload(request: Request, decoder: msgspec.json.Decoder):
+    """Decode and validate a webhook body in one pass."""
+    try:
+        return decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+
+async def _sleeper_payload(request: Request) -> SleeperWebhookPayload:
+    """Dependency that parses the Sleeper webhook body with msgspec."""
+    return await _decode_payload(request, _SLEEPER_PAYLOAD_DECODER)
+
+
+class GenericWebhookPayload(msgspec.Struct):
     """Generic webhook payload for other services."""
     event_type: str
     league_id: str
@@ -31,23 +121,27 @@ class GenericWebhookPayload(BaseModel):
     data: Dict[str, Any]
 
 
+_GENERIC_PAYLOAD_DECODER = msgspec.json.Decoder(GenericWebhookPayload)
+
+
+async def _generic_payload(request: Request) -> GenericWebhookPayload:
+    """Dependency that parses the generic webhook body with msgspec."""
+    return await _decode_payload(request, _GENERIC_PAYLOAD_DECODER)
+
+
 @router.post("/sleeper/{league_id}")
 async def sleeper_webhook(
     league_id: str,
-    payload: SleeperWebhookPayload,
-    background_tasks: BackgroundTasks,
+    payload: SleeperWebhookPayload = Depends(_sleeper_payload),
     db: AsyncSession = Depends(get_db)
 ):
     """Handle Sleeper webhooks for real-time updates."""
     # Verify the league exists in our system
     result = await db.execute(
-        select(League).filter(
-            League.provider == ProviderType.SLEEPER,
-            League.provider_league_id == league_id,
-            League.is_active == True
-        )
+        _ACTIVE_LEAGUE,
+        {"provider": ProviderType.SLEEPER, "provider_league_id": league_id}
     )
-    league = result.scalar_one_or_none()
+    league = result.first()
     
     if not league:
         raise HTTPException(
@@ -57,55 +151,54 @@ async def sleeper_webhook(
     
     # Handle different webhook types
     if payload.type == "waiver":
-        # Waiver processing completed - trigger waiver recap if enabled
+        # Waiver processing completed - trigger waiver recap if enabled,
+        # and also sync league data to get latest transactions
         if league.enable_waiver_recaps:
-            background_tasks.add_task(run_waiver_recap, league.id, payload.week)
-        
-        # Also sync league data to get latest transactions
-        background_tasks.add_task(ingest_sleeper_league, league_id)
+            await _queue_sleeper_sync(
+                league, generate_manual_recap.s(league.id, "waiver_recap", payload.week)
+            )
+        else:
+            await _queue_sleeper_sync(league)
     
     elif payload.type == "transaction":
         # Any transaction occurred - sync data
-        background_tasks.add_task(ingest_sleeper_league, league_id)
+        await _queue_sleeper_sync(league)
     
     elif payload.type == "trade":
         # Trade occurred - sync data and potentially trigger notifications
-        background_tasks.add_task(ingest_sleeper_league, league_id)
+        await _queue_sleeper_sync(league)
     
     elif payload.type == "week_start":
         # New week started - sync data and potentially trigger power rankings
-        background_tasks.add_task(ingest_sleeper_league, league_id)
         if league.enable_power_rankings and payload.week and payload.week > 1:
             # Run power rankings for the previous week
-            background_tasks.add_task(run_power_rankings, league.id, payload.week - 1)
+            await _queue_sleeper_sync(
+                league, generate_manual_recap.s(league.id, "power_rankings", payload.week - 1)
+            )
+        else:
+            await _queue_sleeper_sync(league)
     
     elif payload.type == "matchup_score_update":
         # Scores updated - sync matchup data
-        background_tasks.add_task(ingest_sleeper_league, league_id)
+        await _queue_sleeper_sync(league)
     
-    return {"status": "success", "message": f"Webhook processed for league {league_id}"}
+    return ORJSONResponse({"status": "success", "message": f"Webhook processed for league {league_id}"})
 
 
 @router.post("/yahoo/{league_id}")
 async def yahoo_webhook(
     league_id: str,
-    request: Request,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """Handle Yahoo webhooks (if Yahoo supports them in the future)."""
     # Note: Yahoo doesn't currently support webhooks, but this is here for future compatibility
-    body = await request.body()
     
     # Verify the league exists in our system
     result = await db.execute(
-        select(League).filter(
-            League.provider == ProviderType.YAHOO,
-            League.provider_league_id == league_id,
-            League.is_active == True
-        )
+        _ACTIVE_LEAGUE,
+        {"provider": ProviderType.YAHOO, "provider_league_id": league_id}
     )
-    league = result.scalar_one_or_none()
+    league = result.first()
     
     if not league:
         raise HTTPException(
@@ -116,13 +209,12 @@ async def yahoo_webhook(
     # For now, just acknowledge the webhook
     # In the future, parse the payload and trigger appropriate actions
     
-    return {"status": "success", "message": f"Yahoo webhook received for league {league_id}"}
+    return ORJSONResponse({"status": "success", "message": f"Yahoo webhook received for league {league_id}"})
 
 
 @router.post("/generic")
 async def generic_webhook(
-    payload: GenericWebhookPayload,
-    background_tasks: BackgroundTasks,
+    payload: GenericWebhookPayload = Depends(_generic_payload),
     db: AsyncSession = Depends(get_db)
 ):
     """Handle generic webhooks from external services."""
@@ -139,13 +231,10 @@ async def generic_webhook(
     
     # Verify the league exists in our system
     result = await db.execute(
-        select(League).filter(
-            League.provider == provider_type,
-            League.provider_league_id == payload.league_id,
-            League.is_active == True
-        )
+        _ACTIVE_LEAGUE,
+        {"provider": provider_type, "provider_league_id": payload.league_id}
     )
-    league = result.scalar_one_or_none()
+    league = result.first()
     
     if not league:
         raise HTTPException(
@@ -157,7 +246,7 @@ async def generic_webhook(
     if payload.event_type == "data_sync_required":
         # External service requesting data sync
         if provider_type == ProviderType.SLEEPER:
-            background_tasks.add_task(ingest_sleeper_league, payload.league_id)
+            await _queue_sleeper_sync(league)
         # Add Yahoo sync logic when available
     
     elif payload.event_type == "generate_recap":
@@ -166,34 +255,28 @@ async def generic_webhook(
         week = payload.data.get("week")
         
         if recap_type == "power_rankings" and league.enable_power_rankings:
-            background_tasks.add_task(run_power_rankings, league.id, week)
+            generate_manual_recap.delay(league.id, "power_rankings", week)
         elif recap_type == "waiver_recap" and league.enable_waiver_recaps:
-            background_tasks.add_task(run_waiver_recap, league.id, week)
+            generate_manual_recap.delay(league.id, "waiver_recap", week)
     
-    return {"status": "success", "message": "Generic webhook processed"}
+    return Response(content=_GENERIC_PROCESSED, media_type="application/json")
 
 
 @router.get("/health")
 async def webhook_health():
     """Health check endpoint for webhook services."""
-    return {"status": "healthy", "service": "webhooks"}
+    return Response(content=_HEALTHY, media_type="application/json")
 
 
 @router.post("/test/{league_id}")
 async def test_webhook(
     league_id: str,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """Test webhook endpoint for development and debugging."""
     # Find any league with the given ID for testing
-    result = await db.execute(
-        select(League).filter(
-            League.provider_league_id == league_id,
-            League.is_active == True
-        )
-    )
-    league = result.scalar_one_or_none()
+    result = await db.execute(_ANY_ACTIVE_LEAGUE, {"provider_league_id": league_id})
+    league = result.first()
     
     if not league:
         raise HTTPException(
@@ -203,7 +286,7 @@ async def test_webhook(
     
     # Trigger a test sync
     if league.provider == ProviderType.SLEEPER:
-        background_tasks.add_task(ingest_sleeper_league, league_id)
+        await _queue_sleeper_sync(league)
     
     return {
         "status": "success", 
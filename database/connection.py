@@ -1,4 +1,5 @@
 """Database connection and session management."""
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -13,8 +14,29 @@ class Base(DeclarativeBase):
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
-    echo=settings.debug,
+    echo=settings.db_echo,
     future=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_pre_ping=True,
+    pool_recycle=settings.db_pool_recycle,
+    query_cache_size=settings.db_statement_cache_size,
+    # Bulk inserts/upserts are sent as multi-VALUES statements; larger pages
+    # mean fewer round trips (SQLAlchemy still caps bind parameters per page)
+    insertmanyvalues_page_size=settings.db_insertmanyvalues_page_size,
+    # JSONB columns are (de)serialized with orjson instead of stdlib json
+    json_serializer=lambda value: orjson.dumps(value).decode(),
+    json_deserializer=orjson.loads,
+    connect_args={
+        # asyncpg: reuse prepared statements instead of re-parsing each query
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        "server_settings": {
+            "jit": "off",  # JIT compilation only slows down short OLTP queries
+            "application_name": "aicommissioner",
+        },
+    },
 )
 
 # Create async session factory
@@ -10,6 +10,7 @@ This script demonstrates:
 
 import asyncio
 import os
+import sys
 from datetime import datetime
 
 from database.connection import AsyncSessionLocal
@@ -24,29 +25,45 @@ from publishers.email_publisher import EmailPublisher
 from services.recap_service import RecapService
 
 
+_SETUP_MSG = """=== Email Configuration Setup ===
+Add these to your .env file or environment variables:
+
+# Gmail example:
+SMTP_SERVER=smtp.gmail.com
+SMTP_PORT=587
+SMTP_USERNAME=your-email@gmail.com
+SMTP_PASSWORD=your-app-password
+SMTP_FROM_EMAIL=your-email@gmail.com
+
+# Outlook/Hotmail example:
+SMTP_SERVER=smtp-mail.outlook.com
+SMTP_PORT=587
+SMTP_USERNAME=your-email@outlook.com
+SMTP_PASSWORD=your-password
+SMTP_FROM_EMAIL=your-email@outlook.com
+
+"""
+
+_NEXT_STEPS_MSG = """
+🎉 Setup complete! Your league members will now receive recaps via email.
+
+Next steps:
+1. Set up your SMTP configuration in .env
+2. Add league member emails using the helper functions
+3. Enable email recaps for your leagues
+4. Test with a sample email
+5. Your scheduled recaps will now go to both GroupMe and Email!
+"""
+
+
 async def setup_email_configuration():
     """
     Example of setting up email configuration.
     
-    You'll need to set these environment variables or update your .env file:
+    You'll need to set these environment variables or update your .env file.
+    For Gmail, use an App Password for SMTP_PASSWORD.
     """
-    print("=== Email Configuration Setup ===")
-    print("Add these to your .env file or environment variables:")
-    print()
-    print("# Gmail example:")
-    print("SMTP_SERVER=smtp.gmail.com")
-    print("SMTP_PORT=587")
-    print("SMTP_USERNAME=your-email@gmail.com")
-    print("SMTP_PASSWORD=your-app-password")  # Use App Password for Gmail
-    print("SMTP_FROM_EMAIL=your-email@gmail.com")
-    print()
-    print("# Outlook/Hotmail example:")
-    print("SMTP_SERVER=smtp-mail.outlook.com")
-    print("SMTP_PORT=587")
-    print("SMTP_USERNAME=your-email@outlook.com")
-    print("SMTP_PASSWORD=your-password")
-    print("SMTP_FROM_EMAIL=your-email@outlook.com")
-    print()
+    sys.stdout.write(_SETUP_MSG)
 
 
 async def configure_league_emails(league_id: int):
@@ -149,6 +166,8 @@ AI Commissioner Bot
             
     except Exception as e:
         print(f"✗ Error testing email: {e}")
+    finally:
+        await publisher.close()
 
 
 async def test_recap_service(league_id: int):
@@ -197,13 +216,7 @@ async def main():
     # Test full recap service (uncomment to use)
     # await test_recap_service(LEAGUE_ID)
     
-    print("\n🎉 Setup complete! Your league members will now receive recaps via email.")
-    print("\nNext steps:")
-    print("1. Set up your SMTP configuration in .env")
-    print("2. Add league member emails using the helper functions")
-    print("3. Enable email recaps for your leagues")
-    print("4. Test with a sample email")
-    print("5. Your scheduled recaps will now go to both GroupMe and Email!")
+    sys.stdout.write(_NEXT_STEPS_MSG)
 
 
 if __name__ == "__main__":
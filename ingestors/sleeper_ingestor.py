@@ -1,10 +1,14 @@
 """Sleeper API data ingestor for normalizing fantasy league data."""
-import json
 import asyncio
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 import httpx
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -14,82 +18,166 @@ from models.roster import Roster
 from models.matchup import Matchup
 from models.transaction import Transaction, TransactionType, TransactionStatus
 from config import settings
+from ingestors.upsert import content_hash, upsert_rows
 
 
 class SleeperAPI:
     """Sleeper API client for data retrieval."""
     
     BASE_URL = "https://api.sleeper.app/v1"
+    USERS_CACHE_TTL = 600  # seconds; league members rarely change
+    MAX_ATTEMPTS = 4
+    RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+    
+    # Shared across instances since a new client is created per ingestion
+    _users_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
     
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # HTTP/2 lets concurrent requests share one multiplexed connection
+        self.client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=30),
+            timeout=httpx.Timeout(10.0, connect=5.0),
+        )
+    
+    async def __aenter__(self) -> "SleeperAPI":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
     
     async def close(self):
         """Close the HTTP client."""
         await self.client.aclose()
     
+    async def _get(self, path: str) -> Any:
+        """
+        GET a Sleeper endpoint, retrying rate limits and transient errors.
+        
+        Retries 429/502/503/504 with jittered exponential backoff (honoring
+        Retry-After when given); other errors such as 404 raise immediately.
+        """
+        for attempt in range(self.MAX_ATTEMPTS):
+            response = await self.client.get(f"{self.BASE_URL}{path}")
+            if response.status_code not in self.RETRY_STATUS_CODES or attempt == self.MAX_ATTEMPTS - 1:
+                break
+            
+            retry_after = response.headers.get("retry-after", "")
+            delay = float(retry_after) if retry_after.isdigit() else min(10.0, 0.5 * 2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, 0.5))
+        
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
     async def get_league(self, league_id: str) -> Dict[str, Any]:
         """Get league information."""
-        response = await self.client.get(f"{self.BASE_URL}/league/{league_id}")
-        response.raise_for_status()
-        return response.json()
+        return await self._get(f"/league/{league_id}")
     
     async def get_rosters(self, league_id: str) -> List[Dict[str, Any]]:
         """Get all rosters in a league."""
-        response = await self.client.get(f"{self.BASE_URL}/league/{league_id}/rosters")
-        response.raise_for_status()
-        return response.json()
+        return await self._get(f"/league/{league_id}/rosters")
     
     async def get_users(self, league_id: str) -> List[Dict[str, Any]]:
-        """Get all users in a league."""
-        response = await self.client.get(f"{self.BASE_URL}/league/{league_id}/users")
-        response.raise_for_status()
-        return response.json()
+        """Get all users in a league, cached for USERS_CACHE_TTL seconds."""
+        now = time.monotonic()
+        cached = self._users_cache.get(league_id)
+        if cached and now - cached[0] < self.USERS_CACHE_TTL:
+            return cached[1]
+        
+        users = await self._get(f"/league/{league_id}/users")
+        self._users_cache[league_id] = (now, users)
+        return users
+    
+    @classmethod
+    def invalidate_users(cls, league_id: str):
+        """Drop cached users for a league so the next fetch hits the API."""
+        cls._users_cache.pop(league_id, None)
     
     async def get_matchups(self, league_id: str, week: int) -> List[Dict[str, Any]]:
         """Get matchups for a specific week."""
-        response = await self.client.get(f"{self.BASE_URL}/league/{league_id}/matchups/{week}")
-        response.raise_for_status()
-        return response.json()
+        return await self._get(f"/league/{league_id}/matchups/{week}")
     
     async def get_transactions(self, league_id: str, week: int) -> List[Dict[str, Any]]:
         """Get transactions for a specific week."""
-        response = await self.client.get(f"{self.BASE_URL}/league/{league_id}/transactions/{week}")
-        response.raise_for_status()
-        return response.json()
+        return await self._get(f"/league/{league_id}/transactions/{week}")
     
     async def get_traded_picks(self, league_id: str) -> List[Dict[str, Any]]:
         """Get traded draft picks."""
-        response = await self.client.get(f"{self.BASE_URL}/league/{league_id}/traded_picks")
-        response.raise_for_status()
-        return response.json()
+        return await self._get(f"/league/{league_id}/traded_picks")
 
 
-async def ingest_sleeper_league(league_id: str) -> bool:
+async def ingest_sleeper_league(
+    league_id: str,
+    api: Optional[SleeperAPI] = None,
+    force: bool = False
+) -> bool:
     """
     Ingest all data for a Sleeper league.
     
+    A league synced within the last sleeper_unchanged_sync_minutes whose
+    league payload is unchanged is skipped after a single request.
+    
     Args:
         league_id: Sleeper league ID
+        api: Client to reuse; a new one is created and closed if omitted
+        force: Always run a full ingestion with fresh league users (e.g. for
+            webhook-triggered or manual syncs)
         
     Returns:
         bool: True if successful, False otherwise
     """
-    api = SleeperAPI()
+    if api is None:
+        async with SleeperAPI() as api:
+            return await ingest_sleeper_league(league_id, api, force)
+    
+    now = datetime.now(timezone.utc)
+    
+    # Forced (webhook and manual) syncs exist to pick up fresh data, so don't
+    # serve team and display names from the users cache
+    if force:
+        SleeperAPI.invalidate_users(league_id)
     
     try:
         async with AsyncSessionLocal() as db:
             # Get or create league record
-            result = await db.execute(
-                select(League).filter(
-                    League.provider == ProviderType.SLEEPER,
-                    League.provider_league_id == league_id
-                )
-            )
-            league = result.scalar_one_or_none()
+            league = await _get_sleeper_league(db, league_id)
             
-            # Fetch league data from Sleeper
-            league_data = await api.get_league(league_id)
+            # Fast path: nothing changed since a recent full sync
+            league_data = None
+            if (
+                not force
+                and league
+                and league.last_payload_hash
+                and league.last_sync_at
+                and now - league.last_sync_at < timedelta(minutes=settings.sleeper_unchanged_sync_minutes)
+            ):
+                league_data = await api.get_league(league_id)
+                if content_hash(league_data) == league.last_payload_hash:
+                    return True
+            
+            # Fetch everything from Sleeper in one concurrent round. The
+            # weekly windows depend on the league's current week, so for a
+            # known league start from the stored week; DB writes below stay
+            # sequential since the session can't be shared across tasks
+            if league and league.week:
+                matchup_weeks, transaction_weeks = _sleeper_week_windows(league.week)
+            else:
+                matchup_weeks, transaction_weeks = range(0), range(0)
+            
+            if league_data is None:
+                league_fetch = api.get_league(league_id)
+            else:
+                league_fetch = asyncio.sleep(0, result=league_data)  # Fetched above
+            
+            league_data, rosters_data, users_data, *week_results = await _run_concurrently(
+                league_fetch,
+                api.get_rosters(league_id),
+                api.get_users(league_id),
+                *(_fetch_week(api.get_matchups, league_id, week) for week in matchup_weeks),
+                *(_fetch_week(api.get_transactions, league_id, week) for week in transaction_weeks),
+            )
+            matchup_results = dict(zip(matchup_weeks, week_results[:len(matchup_weeks)]))
+            transaction_results = dict(zip(transaction_weeks, week_results[len(matchup_weeks):]))
             
             if not league:
                 # Create new league record if it doesn't exist
@@ -99,7 +187,7 @@ async def ingest_sleeper_league(league_id: str) -> bool:
                     provider_league_id=league_id,
                     name=league_data.get('name', f'League {league_id}'),
                     league_type=_map_sport_to_league_type(league_data.get('sport', 'nfl')),
-                    season=league_data.get('season', datetime.now().year),
+                    season=league_data.get('season', now.year),
                     week=league_data.get('settings', {}).get('leg', 1),
                     num_teams=league_data.get('total_rosters', 0),
                     scoring_type=_determine_scoring_type(league_data.get('scoring_settings', {})),
@@ -107,6 +195,7 @@ async def ingest_sleeper_league(league_id: str) -> bool:
                 )
                 db.add(league)
                 await db.flush()  # Get the ID
+                _LEAGUE_PK_CACHE[league_id] = league.id
             else:
                 # Update existing league
                 league.name = league_data.get('name', league.name)
@@ -114,28 +203,61 @@ async def ingest_sleeper_league(league_id: str) -> bool:
                 league.num_teams = league_data.get('total_rosters', league.num_teams)
                 league.scoring_type = _determine_scoring_type(league_data.get('scoring_settings', {}))
             
+            # Fetch any weeks the stored week didn't cover (new league, or
+            # the week rolled over since the last sync)
+            matchup_weeks, transaction_weeks = _sleeper_week_windows(league.week or 1)
+            missing_matchup_weeks = [w for w in matchup_weeks if w not in matchup_results]
+            missing_transaction_weeks = [w for w in transaction_weeks if w not in transaction_results]
+            if missing_matchup_weeks or missing_transaction_weeks:
+                missing_results = await _run_concurrently(
+                    *(_fetch_week(api.get_matchups, league_id, week) for week in missing_matchup_weeks),
+                    *(_fetch_week(api.get_transactions, league_id, week) for week in missing_transaction_weeks),
+                )
+                matchup_results.update(zip(missing_matchup_weeks, missing_results))
+                transaction_results.update(
+                    zip(missing_transaction_weeks, missing_results[len(missing_matchup_weeks):])
+                )
+            
             # Ingest rosters
-            await _ingest_sleeper_rosters(api, db, league, league_id)
+            await _apply_sleeper_rosters(db, league, rosters_data, users_data)
             
             # Ingest matchups for current and recent weeks
-            current_week = league.week or 1
-            for week in range(max(1, current_week - 2), current_week + 1):
+            for week in matchup_weeks:
                 try:
-                    await _ingest_sleeper_matchups(api, db, league, league_id, week)
+                    matchups_data = matchup_results[week]
+                    if isinstance(matchups_data, Exception):
+                        raise matchups_data
+                    await _apply_sleeper_matchups(db, league, league_id, week, matchups_data)
                 except Exception as e:
                     print(f"Error ingesting matchups for week {week}: {e}")
                     continue
             
-            # Ingest recent transactions
-            for week in range(max(1, current_week - 1), current_week + 1):
+            # Ingest recent transactions, all weeks in one upsert. Keyed by
+            # provider ID since a statement can't update the same row twice.
+            transaction_rows = {}
+            for week in transaction_weeks:
                 try:
-                    await _ingest_sleeper_transactions(api, db, league, league_id, week)
+                    transactions_data = transaction_results[week]
+                    if isinstance(transactions_data, Exception):
+                        raise transactions_data
+                    for row in _sleeper_transaction_rows(league, week, transactions_data):
+                        transaction_rows[row['provider_transaction_id']] = row
                 except Exception as e:
                     print(f"Error ingesting transactions for week {week}: {e}")
                     continue
             
+            await upsert_rows(
+                db,
+                Transaction,
+                list(transaction_rows.values()),
+                ['league_id', 'provider_transaction_id'],
+                _TRANSACTION_UPDATE_COLUMNS,
+                _TRANSACTION_OPTIONAL_COLUMNS
+            )
+            
             # Update last sync time
-            league.last_sync_at = datetime.utcnow()
+            league.last_sync_at = now
+            league.last_payload_hash = content_hash(league_data)
             
             await db.commit()
             return True
@@ -143,210 +265,278 @@ async def ingest_sleeper_league(league_id: str) -> bool:
     except Exception as e:
         print(f"Error ingesting Sleeper league {league_id}: {e}")
         return False
-    finally:
-        await api.close()
 
 
-async def _ingest_sleeper_rosters(
-    api: SleeperAPI, 
+# Sleeper league ID -> leagues.id, so repeat ingestions load by primary key
+_LEAGUE_PK_CACHE: Dict[str, int] = {}
+
+
+async def _get_sleeper_league(db: AsyncSession, league_id: str) -> Optional[League]:
+    """
+    Load the League for a Sleeper league ID, if it has been ingested before.
+    
+    Known leagues are loaded by primary key (from the identity map when
+    already present) instead of re-running the provider ID lookup. A cached
+    ID whose league has since been deleted is dropped and looked up again.
+    """
+    pk = _LEAGUE_PK_CACHE.get(league_id)
+    if pk is not None:
+        league = await db.get(League, pk)
+        if league is not None:
+            return league
+        _LEAGUE_PK_CACHE.pop(league_id, None)
+    
+    result = await db.execute(
+        select(League).filter(
+            League.provider == ProviderType.SLEEPER,
+            League.provider_league_id == league_id
+        )
+    )
+    league = result.scalar_one_or_none()
+    if league is not None:
+        _LEAGUE_PK_CACHE[league_id] = league.id
+    return league
+
+
+def _sleeper_week_windows(current_week: int) -> Tuple[range, range]:
+    """Weeks to re-ingest: the last three for matchups, the last two for transactions."""
+    return (
+        range(max(1, current_week - 2), current_week + 1),
+        range(max(1, current_week - 1), current_week + 1),
+    )
+
+
+async def _run_concurrently(*coros: Awaitable[Any]) -> List[Any]:
+    """
+    Await coroutines concurrently, returning their results in order.
+    
+    The first failure cancels the remaining requests rather than letting
+    them spend rate limit on an ingestion that is already lost, and is
+    re-raised as-is.
+    """
+    if sys.version_info >= (3, 11):
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(coro) for coro in coros]
+        except ExceptionGroup as eg:
+            raise eg.exceptions[0]
+        return [task.result() for task in tasks]
+    
+    results = await asyncio.gather(*coros, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def _fetch_week(
+    fetch: Callable[[str, int], Awaitable[List[Dict[str, Any]]]],
+    league_id: str,
+    week: int
+) -> Union[List[Dict[str, Any]], Exception]:
+    """
+    Fetch one week of data, treating a missing week as empty.
+    
+    Other errors are returned rather than raised so one bad week is skipped
+    without cancelling the rest of the ingestion.
+    """
+    try:
+        return await fetch(league_id, week)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            # Week doesn't exist yet
+            return []
+        return e
+    except Exception as e:
+        return e
+
+
+# Sleeper transaction type/status strings to our enums
+_SLEEPER_TYPE_MAP = {
+    'waiver': TransactionType.WAIVER,
+    'free_agent': TransactionType.FREE_AGENT,
+    'trade': TransactionType.TRADE,
+}
+_SLEEPER_STATUS_MAP = {
+    'complete': TransactionStatus.COMPLETED,
+    'failed': TransactionStatus.FAILED,
+    'pending': TransactionStatus.PENDING,
+}
+
+# Columns overwritten when an existing row is re-ingested
+_ROSTER_UPDATE_COLUMNS = (
+    'team_name', 'owner_name', 'wins', 'losses', 'ties', 'points_for',
+    'points_against', 'starters', 'bench', 'ir', 'faab_budget', 'data_hash',
+)
+_MATCHUP_UPDATE_COLUMNS = (
+    'team1_roster_id', 'team1_points', 'team1_projected',
+    'team2_roster_id', 'team2_points', 'team2_projected',
+    'is_complete', 'winner_roster_id', 'margin_of_victory', 'data_hash',
+)
+_TRANSACTION_UPDATE_COLUMNS = ('transaction_type', 'status', 'data_hash')
+# Only overwritten when Sleeper sends a value
+_TRANSACTION_OPTIONAL_COLUMNS = (
+    'roster_id', 'players_added', 'players_dropped', 'faab_bid', 'processed_at',
+)
+
+
+async def _apply_sleeper_rosters(
     db: AsyncSession, 
     league: League, 
-    league_id: str
+    rosters_data: List[Dict[str, Any]],
+    users_data: List[Dict[str, Any]]
 ):
-    """Ingest roster data from Sleeper."""
-    rosters_data = await api.get_rosters(league_id)
-    users_data = await api.get_users(league_id)
-    
+    """Apply roster data from Sleeper."""
     # Create user lookup
     user_lookup = {user['user_id']: user for user in users_data}
     
+    rows = []
     for roster_data in rosters_data:
-        roster_id = str(roster_data['roster_id'])
         owner_id = roster_data.get('owner_id')
         user_info = user_lookup.get(owner_id, {}) if owner_id else {}
+        roster_settings = roster_data.get('settings', {})
         
-        # Find or create roster
-        result = await db.execute(
-            select(Roster).filter(
-                Roster.league_id == league.id,
-                Roster.provider_roster_id == roster_id
-            )
-        )
-        roster = result.scalar_one_or_none()
-        
-        if not roster:
-            roster = Roster(
-                league_id=league.id,
-                provider_roster_id=roster_id,
-                provider_owner_id=owner_id,
-            )
-            db.add(roster)
-        
-        # Update roster data
-        roster.team_name = user_info.get('metadata', {}).get('team_name') or user_info.get('display_name')
-        roster.owner_name = user_info.get('display_name')
-        roster.wins = roster_data.get('settings', {}).get('wins', 0)
-        roster.losses = roster_data.get('settings', {}).get('losses', 0)
-        roster.ties = roster_data.get('settings', {}).get('ties', 0)
-        roster.points_for = float(roster_data.get('settings', {}).get('fpts', 0))
-        roster.points_against = float(roster_data.get('settings', {}).get('fpts_against', 0))
-        
-        # Store roster composition as JSON
-        roster.starters = json.dumps(roster_data.get('starters', []))
-        roster.bench = json.dumps(roster_data.get('players', []))
-        roster.ir = json.dumps(roster_data.get('reserve', []))
-        
-        # FAAB budget
-        roster.faab_budget = roster_data.get('settings', {}).get('waiver_budget_used', 0)
+        rows.append({
+            'league_id': league.id,
+            'provider_roster_id': str(roster_data['roster_id']),
+            'provider_owner_id': owner_id,
+            'team_name': user_info.get('metadata', {}).get('team_name') or user_info.get('display_name'),
+            'owner_name': user_info.get('display_name'),
+            'wins': roster_settings.get('wins', 0),
+            'losses': roster_settings.get('losses', 0),
+            'ties': roster_settings.get('ties', 0),
+            'points_for': float(roster_settings.get('fpts', 0)),
+            'points_against': float(roster_settings.get('fpts_against', 0)),
+            # Store roster composition as JSON
+            'starters': roster_data.get('starters', []),
+            'bench': roster_data.get('players', []),
+            'ir': roster_data.get('reserve', []),
+            # FAAB budget
+            'faab_budget': roster_settings.get('waiver_budget_used', 0),
+            'data_hash': content_hash(roster_data, user_info),
+        })
+    
+    await upsert_rows(
+        db, Roster, rows, ['league_id', 'provider_roster_id'], _ROSTER_UPDATE_COLUMNS
+    )
 
 
-async def _ingest_sleeper_matchups(
-    api: SleeperAPI,
+async def _apply_sleeper_matchups(
     db: AsyncSession,
     league: League,
     league_id: str,
-    week: int
+    week: int,
+    matchups_data: List[Dict[str, Any]]
 ):
-    """Ingest matchup data for a specific week."""
-    try:
-        matchups_data = await api.get_matchups(league_id, week)
-    except httpx.HTTPStatusError as e:
-        if e.response.status_code == 404:
-            # Week doesn't exist yet
-            return
-        raise
-    
+    """Apply matchup data for a specific week."""
     # Group matchups by matchup_id
-    matchup_groups = {}
+    matchup_groups = defaultdict(list)
     for matchup in matchups_data:
         matchup_id = matchup.get('matchup_id')
         if matchup_id is None:
             continue  # Bye week
-        
-        if matchup_id not in matchup_groups:
-            matchup_groups[matchup_id] = []
         matchup_groups[matchup_id].append(matchup)
     
+    rows = []
     for matchup_id, teams in matchup_groups.items():
         if len(teams) != 2:
             continue  # Skip if not a valid matchup
         
         team1, team2 = teams[0], teams[1]
-        provider_matchup_id = f"{league_id}_{week}_{matchup_id}"
         
-        # Find or create matchup
-        result = await db.execute(
-            select(Matchup).filter(
-                Matchup.league_id == league.id,
-                Matchup.provider_matchup_id == provider_matchup_id
-            )
-        )
-        matchup = result.scalar_one_or_none()
-        
-        if not matchup:
-            matchup = Matchup(
-                league_id=league.id,
-                provider_matchup_id=provider_matchup_id,
-                week=week,
-                season=league.season,
-            )
-            db.add(matchup)
-        
-        # Update matchup data
-        matchup.team1_roster_id = str(team1['roster_id'])
-        matchup.team1_points = float(team1.get('points', 0))
-        matchup.team1_projected = float(team1.get('points_projected', 0))
-        
-        matchup.team2_roster_id = str(team2['roster_id'])
-        matchup.team2_points = float(team2.get('points', 0))
-        matchup.team2_projected = float(team2.get('points_projected', 0))
+        row = {
+            'league_id': league.id,
+            'provider_matchup_id': f"{league_id}_{week}_{matchup_id}",
+            'week': week,
+            'season': league.season,
+            'team1_roster_id': str(team1['roster_id']),
+            'team1_points': float(team1.get('points', 0)),
+            'team1_projected': float(team1.get('points_projected', 0)),
+            'team2_roster_id': str(team2['roster_id']),
+            'team2_points': float(team2.get('points', 0)),
+            'team2_projected': float(team2.get('points_projected', 0)),
+            'is_complete': False,
+            'winner_roster_id': None,
+            'margin_of_victory': None,
+            'data_hash': content_hash(team1, team2),
+        }
         
         # Determine winner if matchup is complete
         if team1.get('points') is not None and team2.get('points') is not None:
-            matchup.is_complete = True
+            row['is_complete'] = True
             if team1['points'] > team2['points']:
-                matchup.winner_roster_id = str(team1['roster_id'])
-                matchup.margin_of_victory = team1['points'] - team2['points']
+                row['winner_roster_id'] = str(team1['roster_id'])
+                row['margin_of_victory'] = team1['points'] - team2['points']
             elif team2['points'] > team1['points']:
-                matchup.winner_roster_id = str(team2['roster_id'])
-                matchup.margin_of_victory = team2['points'] - team1['points']
+                row['winner_roster_id'] = str(team2['roster_id'])
+                row['margin_of_victory'] = team2['points'] - team1['points']
+        
+        rows.append(row)
+    
+    await upsert_rows(
+        db, Matchup, rows, ['league_id', 'provider_matchup_id'], _MATCHUP_UPDATE_COLUMNS
+    )
 
 
-async def _ingest_sleeper_transactions(
-    api: SleeperAPI,
-    db: AsyncSession,
+def _sleeper_transaction_rows(
     league: League,
-    league_id: str,
-    week: int
-):
-    """Ingest transaction data for a specific week."""
-    try:
-        transactions_data = await api.get_transactions(league_id, week)
-    except httpx.HTTPStatusError as e:
-        if e.response.status_code == 404:
-            # Week doesn't exist yet
-            return
-        raise
-    
+    week: int,
+    transactions_data: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Build transaction upsert rows for a specific week."""
+    rows = []
+    created_rows = []
+    created_ms = []
     for trans_data in transactions_data:
-        transaction_id = str(trans_data['transaction_id'])
-        
-        # Find or create transaction
-        result = await db.execute(
-            select(Transaction).filter(
-                Transaction.league_id == league.id,
-                Transaction.provider_transaction_id == transaction_id
-            )
-        )
-        transaction = result.scalar_one_or_none()
-        
-        if not transaction:
-            transaction = Transaction(
-                league_id=league.id,
-                provider_transaction_id=transaction_id,
-                week=week,
-            )
-            db.add(transaction)
-        
-        # Map transaction type
-        trans_type = trans_data.get('type', 'waiver')
-        if trans_type == 'waiver':
-            transaction.transaction_type = TransactionType.WAIVER
-        elif trans_type == 'free_agent':
-            transaction.transaction_type = TransactionType.FREE_AGENT
-        elif trans_type == 'trade':
-            transaction.transaction_type = TransactionType.TRADE
-        else:
-            transaction.transaction_type = TransactionType.ADD
-        
-        # Set status
-        status_map = {
-            'complete': TransactionStatus.COMPLETED,
-            'failed': TransactionStatus.FAILED,
-            'pending': TransactionStatus.PENDING,
+        row = {
+            'league_id': league.id,
+            'provider_transaction_id': str(trans_data['transaction_id']),
+            'week': week,
+            'roster_id': None,
+            'players_added': None,
+            'players_dropped': None,
+            'faab_bid': None,
+            'processed_at': None,
+            'data_hash': content_hash(trans_data),
         }
-        transaction.status = status_map.get(trans_data.get('status', 'complete'), TransactionStatus.COMPLETED)
+        
+        # Map transaction type and status
+        row['transaction_type'] = _SLEEPER_TYPE_MAP.get(trans_data.get('type', 'waiver'), TransactionType.ADD)
+        row['status'] = _SLEEPER_STATUS_MAP.get(trans_data.get('status', 'complete'), TransactionStatus.COMPLETED)
         
         # Set roster ID (main roster involved)
         if trans_data.get('roster_ids'):
-            transaction.roster_id = str(trans_data['roster_ids'][0])
+            row['roster_id'] = str(trans_data['roster_ids'][0])
         
         # Store player data as JSON
         if trans_data.get('adds'):
-            transaction.players_added = json.dumps(trans_data['adds'])
+            row['players_added'] = trans_data['adds']
         if trans_data.get('drops'):
-            transaction.players_dropped = json.dumps(trans_data['drops'])
+            row['players_dropped'] = trans_data['drops']
         
         # FAAB bid
         if trans_data.get('waiver_budget'):
             for roster_id, bid in trans_data['waiver_budget'].items():
-                if roster_id == transaction.roster_id:
-                    transaction.faab_bid = bid
+                if roster_id == row['roster_id']:
+                    row['faab_bid'] = bid
                     break
         
-        # Processing time
+        # Processing time, converted for all rows at once below
         if trans_data.get('created'):
-            transaction.processed_at = datetime.fromtimestamp(trans_data['created'] / 1000)
+            created_rows.append(row)
+            created_ms.append(trans_data['created'])
+        
+        rows.append(row)
+    
+    # Sleeper timestamps are epoch milliseconds (UTC)
+    if created_ms:
+        import numpy as np  # Deferred: heavy, and only needed for transaction batches
+        
+        processed_at = np.array(created_ms, dtype='datetime64[ms]').astype(datetime)
+        for row, timestamp in zip(created_rows, processed_at):
+            row['processed_at'] = timestamp.replace(tzinfo=timezone.utc)
+    
+    return rows
 
 
 def _map_sport_to_league_type(sport: str) -> LeagueType:
@@ -375,6 +565,34 @@ def _determine_scoring_type(scoring_settings: Dict[str, Any]) -> str:
         return "standard"
 
 
+async def run_sleeper_ingestion_batch(
+    league_ids: List[str],
+    max_concurrent: int = 8
+) -> List[Union[bool, BaseException]]:
+    """
+    Ingest several Sleeper leagues concurrently over one shared client.
+    
+    Args:
+        league_ids: Sleeper league IDs
+        max_concurrent: Maximum leagues ingested at once, to stay within
+            Sleeper's rate limit and the database pool
+        
+    Returns:
+        List of ingestion results (or raised exceptions) in league_ids order
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+    
+    async with SleeperAPI() as api:
+        async def _ingest(league_id: str) -> bool:
+            async with semaphore:
+                return await ingest_sleeper_league(league_id, api)
+        
+        return await asyncio.gather(
+            *(_ingest(league_id) for league_id in league_ids),
+            return_exceptions=True
+        )
+
+
 # Background task function
 async def run_sleeper_ingestion(league_id: str):
     """Background task to run Sleeper ingestion."""
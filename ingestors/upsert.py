@@ -0,0 +1,106 @@
+"""Shared bulk upsert helpers for provider ingestors."""
+import hashlib
+from typing import Any, Dict, List, Tuple
+
+import orjson
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def content_hash(*payloads: Any) -> str:
+    """Fingerprint the provider payloads a row is built from."""
+    return hashlib.blake2b(
+        orjson.dumps(payloads, option=orjson.OPT_SORT_KEYS), digest_size=16
+    ).hexdigest()
+
+
+async def upsert_rows(
+    db: AsyncSession,
+    model: type,
+    rows: List[Dict[str, Any]],
+    index_elements: List[str],
+    update_columns: Tuple[str, ...],
+    optional_columns: Tuple[str, ...] = ()
+):
+    """
+    Insert rows in batched multi-row statements, updating existing rows on conflict.
+    
+    Rows carry a data_hash of their source payload; existing rows whose hash
+    is unchanged are left alone, so no-op syncs don't rewrite anything.
+    
+    Args:
+        db: Database session
+        model: Mapped model class
+        rows: Column values for each row
+        index_elements: Columns of the unique constraint identifying a row
+        update_columns: Columns overwritten on conflict
+        optional_columns: Columns overwritten on conflict only when not null
+    """
+    if not rows:
+        return
+    
+    stmt = insert(model)
+    set_ = {column: stmt.excluded[column] for column in update_columns}
+    for column in optional_columns:
+        set_[column] = func.coalesce(stmt.excluded[column], getattr(model, column))
+    set_['updated_at'] = func.now()
+    
+    # Passing rows as executemany parameters (rather than .values(rows)) keeps
+    # the SQL identical for any row count, so the compiled statement and the
+    # asyncpg prepared statement are reused; SQLAlchemy packs the rows into
+    # multi-VALUES batches within the bind parameter limit.
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_=set_,
+            where=model.data_hash.is_distinct_from(stmt.excluded.data_hash)
+        ),
+        rows
+    )
+
+
+async def copy_rows(db: AsyncSession, model: type, rows: List[Dict[str, Any]]):
+    """
+    Bulk-load rows with PostgreSQL COPY on the session's connection.
+    
+    Much faster than INSERT for large loads, but has no conflict handling,
+    so only use it for rows known not to exist yet (e.g. a league's first
+    sync). Python-side column defaults are filled in and values go through
+    the column types' bind processing (Enum names, JSONB serialization), so
+    rows match what an INSERT through SQLAlchemy would write.
+    
+    Args:
+        db: Database session
+        model: Mapped model class
+        rows: Column values for each row; all rows must have the same keys
+    """
+    if not rows:
+        return
+    
+    table = model.__table__
+    defaults = {
+        column.name: column.default.arg
+        for column in table.columns
+        if column.default is not None and column.default.is_scalar
+    }
+    columns = list(rows[0])
+    columns += [name for name in defaults if name not in rows[0]]
+    
+    connection = await db.connection()
+    dialect = connection.dialect
+    processors = [
+        table.c[name].type.dialect_impl(dialect).bind_processor(dialect) for name in columns
+    ]
+    records = [
+        tuple(
+            processor(value) if processor and value is not None else value
+            for processor, value in zip(processors, (row.get(name, defaults.get(name)) for name in columns))
+        )
+        for row in rows
+    ]
+    
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        table.name, records=records, columns=columns
+    )
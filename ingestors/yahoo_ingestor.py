@@ -1,12 +1,18 @@
 """Yahoo Fantasy API data ingestor for normalizing fantasy league data."""
-import json
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Tuple
 
+import aiohttp
 import httpx
+import orjson
+from lxml import etree
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import raiseload
 
 from database.connection import AsyncSessionLocal
 from models.user import User
@@ -15,23 +21,59 @@ from models.roster import Roster
 from models.matchup import Matchup
 from models.transaction import Transaction, TransactionType, TransactionStatus
 from config import settings
+from ingestors.upsert import content_hash, copy_rows, upsert_rows
+
+logger = logging.getLogger(__name__)
+
+# Refresh tokens this close to expiry so they can't lapse mid-sync
+_TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+
+def create_yahoo_session() -> aiohttp.ClientSession:
+    """
+    Create an HTTP session for Yahoo API requests.
+    
+    Carries no credentials (each YahooAPI sends its user's token per
+    request), so one session can be shared across users to reuse its
+    keep-alive connections.
+    """
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=30.0),
+        connector=aiohttp.TCPConnector(limit=64, limit_per_host=16, keepalive_timeout=60),
+    )
 
 
 class YahooAPI:
     """Yahoo Fantasy API client for data retrieval."""
     
     BASE_URL = "https://fantasysports.yahooapis.com/fantasy/v2"
+    MAX_CONCURRENT_REQUESTS = 8  # Stay well inside Yahoo's rate limits
+    MAX_ATTEMPTS = 3
+    # 999 is Yahoo's "request denied" response when rate limiting
+    RETRY_STATUS_CODES = frozenset({429, 502, 503, 504, 999})
+    LEAGUE_CACHE_TTL = 3600  # seconds; league settings are static within a season
     
-    def __init__(self, access_token: str):
+    # Shared across instances (and users in the same league) since a client
+    # is created per user
+    _league_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+    
+    def __init__(self, access_token: str, session: Optional[aiohttp.ClientSession] = None):
+        """
+        Args:
+            access_token: The user's Yahoo OAuth access token
+            session: Shared session to send requests on; a private one is
+                created (and closed by close()) if omitted
+        """
         self.access_token = access_token
-        self.client = httpx.AsyncClient(
-            timeout=30.0,
-            headers={"Authorization": f"Bearer {access_token}"}
-        )
+        self._headers = {"Authorization": f"Bearer {access_token}"}
+        self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        self._owns_session = session is None
+        self.session = session or create_yahoo_session()
     
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Close the HTTP session if this client created it."""
+        if self._owns_session:
+            await self.session.close()
     
     async def get_user_leagues(self, game_key: str = "nfl") -> List[Dict[str, Any]]:
         """Get all leagues for the authenticated user."""
@@ -39,88 +81,175 @@ class YahooAPI:
         current_year = datetime.now().year
         game_id = f"{current_year if game_key == 'nfl' else game_key}"
         
-        response = await self.client.get(
-            f"{self.BASE_URL}/users;use_login=1/games;game_keys={game_id}/leagues"
+        return await self._get_records(
+            f"/users;use_login=1/games;game_keys={game_id}/leagues", "league"
         )
-        response.raise_for_status()
-        
-        # Parse XML response (Yahoo returns XML)
-        # For simplicity, we'll assume JSON conversion is handled elsewhere
-        # In a real implementation, you'd use an XML parser like xmltodict
-        return self._parse_yahoo_response(response.text)
     
     async def get_league(self, league_key: str) -> Dict[str, Any]:
-        """Get league information."""
-        response = await self.client.get(f"{self.BASE_URL}/league/{league_key}")
-        response.raise_for_status()
-        return self._parse_yahoo_response(response.text)
+        """Get league information, cached for LEAGUE_CACHE_TTL seconds."""
+        now = time.monotonic()
+        cached = self._league_cache.get(league_key)
+        if cached and now - cached[0] < self.LEAGUE_CACHE_TTL:
+            return cached[1]
+        
+        leagues = await self._get_records(f"/league/{league_key}", "league")
+        league = leagues[0] if leagues else {}
+        self._league_cache[league_key] = (now, league)
+        return league
     
     async def get_teams(self, league_key: str) -> List[Dict[str, Any]]:
         """Get all teams in a league."""
-        response = await self.client.get(f"{self.BASE_URL}/league/{league_key}/teams")
-        response.raise_for_status()
-        return self._parse_yahoo_response(response.text)
+        return await self._get_records(f"/league/{league_key}/teams", "team")
     
     async def get_scoreboard(self, league_key: str, week: int) -> List[Dict[str, Any]]:
         """Get matchups/scoreboard for a specific week."""
-        response = await self.client.get(
-            f"{self.BASE_URL}/league/{league_key}/scoreboard;week={week}"
+        return await self._get_records(
+            f"/league/{league_key}/scoreboard;week={week}", "matchup"
         )
-        response.raise_for_status()
-        return self._parse_yahoo_response(response.text)
     
     async def get_transactions(self, league_key: str, transaction_type: str = "add,drop,trade") -> List[Dict[str, Any]]:
         """Get transactions for a league."""
-        response = await self.client.get(
-            f"{self.BASE_URL}/league/{league_key}/transactions;types={transaction_type}"
+        return await self._get_records(
+            f"/league/{league_key}/transactions;types={transaction_type}", "transaction"
         )
-        response.raise_for_status()
-        return self._parse_yahoo_response(response.text)
     
     async def get_standings(self, league_key: str) -> List[Dict[str, Any]]:
         """Get league standings."""
-        response = await self.client.get(f"{self.BASE_URL}/league/{league_key}/standings")
-        response.raise_for_status()
-        return self._parse_yahoo_response(response.text)
+        return await self._get_records(f"/league/{league_key}/standings", "team")
     
-    def _parse_yahoo_response(self, xml_text: str) -> Dict[str, Any]:
+    async def _get_records(self, path: str, record_tag: str) -> List[Dict[str, Any]]:
         """
-        Parse Yahoo's XML response to dict.
-        This is a placeholder - in a real implementation, you'd use xmltodict or similar.
+        GET a Yahoo endpoint and parse each <record_tag> element into a dict.
+        
+        Yahoo returns XML. The body is fed to an incremental parser as it
+        downloads, and each record is converted and then cleared from the
+        tree, so parsing overlaps the transfer and large payloads never
+        build a full document in memory.
+        
+        Rate limits and transient errors (RETRY_STATUS_CODES) are retried
+        with jittered exponential backoff, honoring Retry-After when given;
+        other errors such as 404 raise immediately.
         """
-        # For now, return empty dict - you'll need to implement XML parsing
-        # Yahoo's API returns XML, not JSON
-        return {}
+        parser = etree.XMLPullParser(events=("end",), tag=f"{{*}}{record_tag}")
+        records = []
+        
+        for attempt in range(self.MAX_ATTEMPTS):
+            async with self._semaphore, self.session.get(f"{self.BASE_URL}{path}", headers=self._headers) as response:
+                if response.status not in self.RETRY_STATUS_CODES or attempt == self.MAX_ATTEMPTS - 1:
+                    response.raise_for_status()
+                    async for chunk in response.content.iter_any():
+                        parser.feed(chunk)
+                        records.extend(_drain_records(parser))
+                    break
+                
+                retry_after = response.headers.get("Retry-After", "")
+            
+            delay = float(retry_after) if retry_after.isdigit() else min(30.0, 2.0 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, 1.0))
+        
+        parser.close()
+        records.extend(_drain_records(parser))
+        return records
+
+
+def _drain_records(parser: etree.XMLPullParser) -> List[Dict[str, Any]]:
+    """Convert completed record elements and free them from the tree."""
+    records = []
+    for _, elem in parser.read_events():
+        records.append(_element_to_dict(elem))
+        
+        # Release the record and any already-processed siblings
+        elem.clear()
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
+    return records
+
+
+# Yahoo containers whose children always repeat, parsed as lists even when
+# they hold zero or one element
+_YAHOO_LIST_TAGS = frozenset({
+    'leagues', 'teams', 'matchups', 'transactions', 'players', 'managers',
+})
+
+# Namespaced tag -> local name; Yahoo documents use a handful of tags
+_LOCAL_NAMES: Dict[str, str] = {}
+
 
+def _local_name(tag: str) -> str:
+    """Strip the namespace from an lxml tag, memoized per tag."""
+    name = _LOCAL_NAMES.get(tag)
+    if name is None:
+        name = _LOCAL_NAMES[tag] = tag.rpartition('}')[2]
+    return name
 
-async def ingest_yahoo_leagues(user_id: int) -> bool:
+
+def _element_to_dict(elem: etree._Element) -> Any:
+    """
+    Convert a Yahoo XML element to plain Python data.
+    
+    Known repeated containers (<teams><team/>...</teams>) become lists and
+    other leaf elements become their text; remaining elements become a dict
+    keyed by child tag without namespace. Attributes such as count are
+    dropped.
+    """
+    if _local_name(elem.tag) in _YAHOO_LIST_TAGS:
+        return [_element_to_dict(child) for child in elem]
+    
+    if len(elem) == 0:
+        return elem.text
+    
+    data: Dict[str, Any] = {}
+    for child in elem:
+        child_tag = _local_name(child.tag)
+        value = _element_to_dict(child)
+        if child_tag in data:
+            if not isinstance(data[child_tag], list):
+                data[child_tag] = [data[child_tag]]
+            data[child_tag].append(value)
+        else:
+            data[child_tag] = value
+    return data
+
+
+async def ingest_yahoo_leagues(user_id: int, session: Optional[aiohttp.ClientSession] = None) -> bool:
     """
     Ingest all Yahoo leagues for a user.
     
     Args:
         user_id: Internal user ID
+        session: Shared Yahoo session (see create_yahoo_session) to reuse
+            connections across users; a private one is used if omitted
         
     Returns:
         bool: True if successful, False otherwise
     """
+    now = datetime.now(timezone.utc)
+    
     try:
-        async with AsyncSessionLocal() as db:
+        # One transaction per user: token refresh and every league commit
+        # together when the block exits, or roll back together on error
+        async with AsyncSessionLocal() as db, db.begin():
             # Get user with Yahoo tokens
             result = await db.execute(select(User).filter(User.id == user_id))
             user = result.scalar_one_or_none()
             
             if not user or not user.yahoo_access_token:
-                print(f"User {user_id} not found or no Yahoo access token")
+                logger.warning("User %s not found or no Yahoo access token", user_id)
                 return False
             
-            # Check if token is expired and refresh if needed
-            if user.yahoo_token_expires_at and user.yahoo_token_expires_at <= datetime.utcnow():
-                success = await _refresh_yahoo_token(db, user)
+            # Refresh the token only if it expires before the sync could finish
+            expires_at = user.yahoo_token_expires_at
+            if expires_at and expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            if expires_at and expires_at - now <= _TOKEN_REFRESH_MARGIN:
+                success = await _refresh_yahoo_token(db, user, now)
                 if not success:
-                    print(f"Failed to refresh Yahoo token for user {user_id}")
+                    logger.error("Failed to refresh Yahoo token for user %s", user_id)
                     return False
             
-            api = YahooAPI(user.yahoo_access_token)
+            api = YahooAPI(user.yahoo_access_token, session)
             
             try:
                 # Get user's leagues
@@ -132,16 +261,15 @@ async def ingest_yahoo_leagues(user_id: int) -> bool:
                         continue
                     
                     # Process each league
-                    await _ingest_yahoo_league(api, db, user, league_key, league_data)
+                    await _ingest_yahoo_league(api, db, user, league_key, league_data, now)
                 
-                await db.commit()
                 return True
                 
             finally:
                 await api.close()
                 
     except Exception as e:
-        print(f"Error ingesting Yahoo leagues for user {user_id}: {e}")
+        logger.exception("Error ingesting Yahoo leagues for user %s: %s", user_id, e)
         return False
 
 
@@ -150,32 +278,53 @@ async def _ingest_yahoo_league(
     db: AsyncSession,
     user: User,
     league_key: str,
-    league_data: Dict[str, Any]
+    league_data: Dict[str, Any],
+    now: datetime
 ):
     """Ingest a single Yahoo league."""
-    # Find or create league record
+    # Find or create league record. Child rows are written in bulk below,
+    # never through the relationships, so fail loudly on a lazy load rather
+    # than eager-loading collections nothing reads
     result = await db.execute(
         select(League).filter(
             League.provider == ProviderType.YAHOO,
             League.provider_league_id == league_key,
             League.owner_id == user.id
-        )
+        ).options(raiseload("*"))
     )
     league = result.scalar_one_or_none()
     
-    if not league:
-        # Get more detailed league info
-        detailed_league_data = await api.get_league(league_key)
-        
+    # Fetch everything for the league concurrently (the API caps requests
+    # in flight); DB writes below stay sequential on the shared session
+    current_week = int(league_data.get('current_week') or (league.week if league else None) or 1)
+    weeks = range(max(1, current_week - 2), current_week + 1)
+    
+    detailed_league_data, teams_data, standings_data, transactions_data, *scoreboards = await asyncio.gather(
+        # More detailed league info is only needed for a new league
+        api.get_league(league_key) if not league else _no_data(),
+        api.get_teams(league_key),
+        api.get_standings(league_key),
+        api.get_transactions(league_key),
+        *(_fetch_scoreboard(api, league_key, week) for week in weeks),
+        return_exceptions=True
+    )
+    for data in (detailed_league_data, teams_data, standings_data):
+        if isinstance(data, BaseException):
+            raise data
+    
+    # A new league has no rows yet, so they can be bulk-loaded with COPY
+    new_league = league is None
+    
+    if new_league:
         league = League(
             provider=ProviderType.YAHOO,
             provider_league_id=league_key,
             owner_id=user.id,
             name=league_data.get('name', f'League {league_key}'),
             league_type=_map_yahoo_sport_to_league_type(league_data.get('game_code', 'nfl')),
-            season=league_data.get('season', datetime.now().year),
-            week=league_data.get('current_week', 1),
-            num_teams=league_data.get('num_teams', 0),
+            season=int(league_data.get('season', now.year)),
+            week=int(league_data.get('current_week', 1)),
+            num_teams=int(league_data.get('num_teams', 0)),
             scoring_type=_determine_yahoo_scoring_type(detailed_league_data.get('settings', {})),
         )
         db.add(league)
@@ -183,41 +332,117 @@ async def _ingest_yahoo_league(
     else:
         # Update existing league
         league.name = league_data.get('name', league.name)
-        league.week = league_data.get('current_week', league.week)
-        league.num_teams = league_data.get('num_teams', league.num_teams)
+        league.week = int(league_data.get('current_week', league.week))
+        league.num_teams = int(league_data.get('num_teams', league.num_teams))
     
     # Ingest teams/rosters
-    await _ingest_yahoo_teams(api, db, league, league_key)
+    await _ingest_yahoo_teams(db, league, teams_data, standings_data, new_league)
     
     # Ingest matchups for current and recent weeks
-    current_week = league.week or 1
-    for week in range(max(1, current_week - 2), current_week + 1):
+    for week, scoreboard_data in zip(weeks, scoreboards):
         try:
-            await _ingest_yahoo_matchups(api, db, league, league_key, week)
+            if isinstance(scoreboard_data, Exception):
+                raise scoreboard_data
+            await _ingest_yahoo_matchups(db, league, league_key, week, scoreboard_data, new_league)
         except Exception as e:
-            print(f"Error ingesting Yahoo matchups for week {week}: {e}")
+            logger.error("Error ingesting Yahoo matchups for week %s: %s", week, e)
             continue
     
     # Ingest transactions
     try:
-        await _ingest_yahoo_transactions(api, db, league, league_key)
+        if isinstance(transactions_data, Exception):
+            raise transactions_data
+        await _ingest_yahoo_transactions(db, league, transactions_data, new_league)
     except Exception as e:
-        print(f"Error ingesting Yahoo transactions: {e}")
+        logger.error("Error ingesting Yahoo transactions: %s", e)
     
     # Update last sync time
-    league.last_sync_at = datetime.utcnow()
+    league.last_sync_at = now
+
+
+async def _no_data() -> Dict[str, Any]:
+    """Placeholder for a fetch that isn't needed."""
+    return {}
+
+
+async def _fetch_scoreboard(api: YahooAPI, league_key: str, week: int) -> List[Dict[str, Any]]:
+    """Fetch one week's scoreboard, treating a missing week as empty."""
+    try:
+        return await api.get_scoreboard(league_key, week)
+    except aiohttp.ClientResponseError as e:
+        if e.status == 404:
+            # Week doesn't exist yet
+            return []
+        raise
+
+
+# Yahoo transaction type/status strings to our enums. Types are matched by
+# substring in this order, so compound types such as "pending_trade" and
+# "add/drop" map by their first matching keyword
+_YAHOO_TYPE_MAP = (
+    ('trade', TransactionType.TRADE),
+    ('add', TransactionType.ADD),
+    ('drop', TransactionType.DROP),
+)
+_YAHOO_STATUS_MAP = {
+    'successful': TransactionStatus.COMPLETED,
+    'pending': TransactionStatus.PENDING,
+}
+
+# Columns overwritten when an existing row is re-ingested
+_ROSTER_UPDATE_COLUMNS = (
+    'team_name', 'owner_name', 'wins', 'losses', 'ties', 'points_for',
+    'points_against', 'starters', 'data_hash',
+)
+_MATCHUP_UPDATE_COLUMNS = (
+    'team1_roster_id', 'team1_points', 'team1_projected',
+    'team2_roster_id', 'team2_points', 'team2_projected',
+    'is_complete', 'winner_roster_id', 'margin_of_victory', 'data_hash',
+)
+_TRANSACTION_UPDATE_COLUMNS = (
+    'transaction_type', 'status', 'players_added', 'players_dropped', 'data_hash',
+)
+# Only overwritten when Yahoo sends a value
+_TRANSACTION_OPTIONAL_COLUMNS = ('roster_id', 'processed_at')
+
+
+# Shapes _element_to_dict produces for the team records read below.
+#
+# /league/{key}/teams:
+#   <team>
+#     <team_key>423.l.1.t.1</team_key>
+#     <name>Team Alpha</name>
+#     <managers>
+#       <manager><manager_id>1</manager_id><nickname>Sam</nickname><guid>ABC123</guid></manager>
+#     </managers>
+#   </team>
+#   -> {'team_key': '423.l.1.t.1', 'name': 'Team Alpha',
+#       'managers': [{'manager_id': '1', 'nickname': 'Sam', 'guid': 'ABC123'}]}
+#
+# /league/{key}/standings:
+#   <team>
+#     <team_key>423.l.1.t.1</team_key>
+#     <team_standings>
+#       <rank>1</rank>
+#       <outcome_totals><wins>3</wins><losses>0</losses><ties>0</ties></outcome_totals>
+#       <points_for>412.5</points_for>
+#       <points_against>350.1</points_against>
+#     </team_standings>
+#   </team>
+#   -> {'team_key': '423.l.1.t.1',
+#       'team_standings': {'rank': '1',
+#                          'outcome_totals': {'wins': '3', 'losses': '0', 'ties': '0'},
+#                          'points_for': '412.5', 'points_against': '350.1'}}
 
 
 async def _ingest_yahoo_teams(
-    api: YahooAPI,
     db: AsyncSession,
     league: League,
-    league_key: str
+    teams_data: List[Dict[str, Any]],
+    standings_data: List[Dict[str, Any]],
+    new_league: bool = False
 ):
     """Ingest team/roster data from Yahoo."""
-    teams_data = await api.get_teams(league_key)
-    standings_data = await api.get_standings(league_key)
-    
     # Create standings lookup
     standings_lookup = {}
     for standing in standings_data:
@@ -225,159 +450,140 @@ async def _ingest_yahoo_teams(
         if team_key:
             standings_lookup[team_key] = standing
     
+    rows = []
     for team_data in teams_data:
         team_key = team_data.get('team_key')
         if not team_key:
             continue
         
-        # Find or create roster
-        result = await db.execute(
-            select(Roster).filter(
-                Roster.league_id == league.id,
-                Roster.provider_roster_id == team_key
-            )
-        )
-        roster = result.scalar_one_or_none()
-        
-        if not roster:
-            roster = Roster(
-                league_id=league.id,
-                provider_roster_id=team_key,
-                provider_owner_id=team_data.get('owner_guid'),
-            )
-            db.add(roster)
-        
-        # Update roster data
-        roster.team_name = team_data.get('name')
-        roster.owner_name = team_data.get('manager', {}).get('nickname')
-        
         # Get standings data
         standing = standings_lookup.get(team_key, {})
-        outcome_totals = standing.get('outcome_totals', {})
+        team_standings = standing.get('team_standings') or {}
+        outcome_totals = team_standings.get('outcome_totals') or {}
         
-        roster.wins = int(outcome_totals.get('wins', 0))
-        roster.losses = int(outcome_totals.get('losses', 0))
-        roster.ties = int(outcome_totals.get('ties', 0))
-        roster.points_for = float(standing.get('points_for', 0))
-        roster.points_against = float(standing.get('points_against', 0))
+        # The first listed manager owns the team; co-managers follow
+        managers = team_data.get('managers') or []
+        manager = managers[0] if managers else {}
         
-        # Store current roster (would need separate API call for detailed roster)
-        # For now, just store the team key
-        roster.starters = json.dumps([team_key])
+        rows.append({
+            'league_id': league.id,
+            'provider_roster_id': team_key,
+            'provider_owner_id': manager.get('guid'),
+            'team_name': team_data.get('name'),
+            'owner_name': manager.get('nickname'),
+            'wins': int(outcome_totals.get('wins') or 0),
+            'losses': int(outcome_totals.get('losses') or 0),
+            'ties': int(outcome_totals.get('ties') or 0),
+            'points_for': float(team_standings.get('points_for') or 0),
+            'points_against': float(team_standings.get('points_against') or 0),
+            # Store current roster (would need separate API call for detailed roster)
+            # For now, just store the team key
+            'starters': [team_key],
+            'data_hash': content_hash(team_data, standing),
+        })
+    
+    if new_league:
+        await copy_rows(db, Roster, rows)
+    else:
+        await upsert_rows(
+            db, Roster, rows, ['league_id', 'provider_roster_id'], _ROSTER_UPDATE_COLUMNS
+        )
 
 
 async def _ingest_yahoo_matchups(
-    api: YahooAPI,
     db: AsyncSession,
     league: League,
     league_key: str,
-    week: int
+    week: int,
+    scoreboard_data: List[Dict[str, Any]],
+    new_league: bool = False
 ):
     """Ingest matchup data for a specific week."""
-    try:
-        scoreboard_data = await api.get_scoreboard(league_key, week)
-    except httpx.HTTPStatusError as e:
-        if e.response.status_code == 404:
-            # Week doesn't exist yet
-            return
-        raise
-    
+    rows = []
     for matchup_data in scoreboard_data:
         teams = matchup_data.get('teams', [])
         if len(teams) != 2:
             continue  # Skip bye weeks or invalid matchups
         
         team1, team2 = teams[0], teams[1]
-        provider_matchup_id = f"{league_key}_{week}_{team1.get('team_key')}_{team2.get('team_key')}"
-        
-        # Find or create matchup
-        result = await db.execute(
-            select(Matchup).filter(
-                Matchup.league_id == league.id,
-                Matchup.provider_matchup_id == provider_matchup_id
-            )
-        )
-        matchup = result.scalar_one_or_none()
-        
-        if not matchup:
-            matchup = Matchup(
-                league_id=league.id,
-                provider_matchup_id=provider_matchup_id,
-                week=week,
-                season=league.season,
-            )
-            db.add(matchup)
-        
-        # Update matchup data
-        matchup.team1_roster_id = team1.get('team_key')
-        matchup.team1_points = float(team1.get('team_points', {}).get('total', 0))
-        matchup.team1_projected = float(team1.get('team_projected_points', {}).get('total', 0))
+        row = {
+            'league_id': league.id,
+            'provider_matchup_id': f"{league_key}_{week}_{team1.get('team_key')}_{team2.get('team_key')}",
+            'week': week,
+            'season': league.season,
+            'team1_roster_id': team1.get('team_key'),
+            'team1_points': float(team1.get('team_points', {}).get('total', 0)),
+            'team1_projected': float(team1.get('team_projected_points', {}).get('total', 0)),
+            'team2_roster_id': team2.get('team_key'),
+            'team2_points': float(team2.get('team_points', {}).get('total', 0)),
+            'team2_projected': float(team2.get('team_projected_points', {}).get('total', 0)),
+            'is_complete': False,
+            'winner_roster_id': None,
+            'margin_of_victory': None,
+            'data_hash': content_hash(team1, team2),
+        }
+        rows.append(row)
+    
+    # Determine winners for all matchups in one vectorized pass
+    if rows:
+        import numpy as np  # Deferred: heavy, and only needed for matchup batches
         
-        matchup.team2_roster_id = team2.get('team_key')
-        matchup.team2_points = float(team2.get('team_points', {}).get('total', 0))
-        matchup.team2_projected = float(team2.get('team_projected_points', {}).get('total', 0))
+        team1_points = np.fromiter((row['team1_points'] for row in rows), dtype=float, count=len(rows))
+        team2_points = np.fromiter((row['team2_points'] for row in rows), dtype=float, count=len(rows))
+        complete = (team1_points > 0) | (team2_points > 0)
+        team1_won = complete & (team1_points > team2_points)
+        team2_won = complete & (team2_points > team1_points)
+        margins = np.abs(team1_points - team2_points)
         
-        # Determine winner
-        if matchup.team1_points > 0 or matchup.team2_points > 0:
-            matchup.is_complete = True
-            if matchup.team1_points > matchup.team2_points:
-                matchup.winner_roster_id = matchup.team1_roster_id
-                matchup.margin_of_victory = matchup.team1_points - matchup.team2_points
-            elif matchup.team2_points > matchup.team1_points:
-                matchup.winner_roster_id = matchup.team2_roster_id
-                matchup.margin_of_victory = matchup.team2_points - matchup.team1_points
+        # tolist() hands back plain Python values for the DB driver
+        for row, is_complete, won1, won2, margin in zip(
+            rows, complete.tolist(), team1_won.tolist(), team2_won.tolist(), margins.tolist()
+        ):
+            row['is_complete'] = is_complete
+            if won1:
+                row['winner_roster_id'] = row['team1_roster_id']
+                row['margin_of_victory'] = margin
+            elif won2:
+                row['winner_roster_id'] = row['team2_roster_id']
+                row['margin_of_victory'] = margin
+    
+    if new_league:
+        await copy_rows(db, Matchup, rows)
+    else:
+        await upsert_rows(
+            db, Matchup, rows, ['league_id', 'provider_matchup_id'], _MATCHUP_UPDATE_COLUMNS
+        )
 
 
 async def _ingest_yahoo_transactions(
-    api: YahooAPI,
     db: AsyncSession,
     league: League,
-    league_key: str
+    transactions_data: List[Dict[str, Any]],
+    new_league: bool = False
 ):
     """Ingest transaction data from Yahoo."""
-    transactions_data = await api.get_transactions(league_key)
-    
+    rows = []
     for trans_data in transactions_data:
         transaction_key = trans_data.get('transaction_key')
         if not transaction_key:
             continue
         
-        # Find or create transaction
-        result = await db.execute(
-            select(Transaction).filter(
-                Transaction.league_id == league.id,
-                Transaction.provider_transaction_id == transaction_key
-            )
-        )
-        transaction = result.scalar_one_or_none()
-        
-        if not transaction:
-            transaction = Transaction(
-                league_id=league.id,
-                provider_transaction_id=transaction_key,
-                week=trans_data.get('week', 1),
-            )
-            db.add(transaction)
+        row = {
+            'league_id': league.id,
+            'provider_transaction_id': transaction_key,
+            'week': int(trans_data.get('week', 1)),
+            'roster_id': None,
+            'processed_at': None,
+            'data_hash': content_hash(trans_data),
+        }
         
-        # Map transaction type
-        trans_type = trans_data.get('type', 'add/drop')
-        if 'trade' in trans_type.lower():
-            transaction.transaction_type = TransactionType.TRADE
-        elif 'add' in trans_type.lower():
-            transaction.transaction_type = TransactionType.ADD
-        elif 'drop' in trans_type.lower():
-            transaction.transaction_type = TransactionType.DROP
-        else:
-            transaction.transaction_type = TransactionType.WAIVER
-        
-        # Set status based on Yahoo status
-        status = trans_data.get('status', 'successful')
-        if status == 'successful':
-            transaction.status = TransactionStatus.COMPLETED
-        elif status == 'pending':
-            transaction.status = TransactionStatus.PENDING
-        else:
-            transaction.status = TransactionStatus.FAILED
+        # Map transaction type and status
+        trans_type = trans_data.get('type', 'add/drop').casefold()
+        row['transaction_type'] = next(
+            (value for keyword, value in _YAHOO_TYPE_MAP if keyword in trans_type),
+            TransactionType.WAIVER
+        )
+        row['status'] = _YAHOO_STATUS_MAP.get(trans_data.get('status', 'successful'), TransactionStatus.FAILED)
         
         # Get team involved
         players = trans_data.get('players', [])
@@ -385,66 +591,109 @@ async def _ingest_yahoo_transactions(
             # Find the team that made the transaction
             for player in players:
                 if player.get('transaction_data'):
-                    transaction.roster_id = player['transaction_data'].get('destination_team_key')
+                    row['roster_id'] = player['transaction_data'].get('destination_team_key')
                     break
         
         # Store player data as JSON
-        transaction.players_added = json.dumps([
+        row['players_added'] = [
             p for p in players if p.get('transaction_data', {}).get('type') == 'add'
-        ])
-        transaction.players_dropped = json.dumps([
+        ]
+        row['players_dropped'] = [
             p for p in players if p.get('transaction_data', {}).get('type') == 'drop'
-        ])
+        ]
         
-        # Processing time
-        if trans_data.get('timestamp'):
-            transaction.processed_at = datetime.fromtimestamp(int(trans_data['timestamp']))
+        # Processing time (epoch seconds, parsed from XML as a string)
+        timestamp = trans_data.get('timestamp')
+        if timestamp:
+            row['processed_at'] = datetime.fromtimestamp(
+                timestamp if isinstance(timestamp, int) else int(timestamp), tz=timezone.utc
+            )
+        
+        rows.append(row)
+    
+    if new_league:
+        await copy_rows(db, Transaction, rows)
+    else:
+        await upsert_rows(
+            db,
+            Transaction,
+            rows,
+            ['league_id', 'provider_transaction_id'],
+            _TRANSACTION_UPDATE_COLUMNS,
+            _TRANSACTION_OPTIONAL_COLUMNS
+        )
+
+
+# Pooled client for Yahoo token refreshes, keeping the TLS connection to
+# api.login.yahoo.com alive between users. Connections belong to the event
+# loop that opened them and Celery tasks each run their own loop, so the
+# client is rebuilt when the running loop changes.
+_oauth_client: Optional[httpx.AsyncClient] = None
+_oauth_client_loop: Optional[asyncio.AbstractEventLoop] = None
 
 
-async def _refresh_yahoo_token(db: AsyncSession, user: User) -> bool:
+def _get_oauth_client() -> httpx.AsyncClient:
+    """Get the shared Yahoo OAuth client for the running event loop."""
+    global _oauth_client, _oauth_client_loop
+    loop = asyncio.get_running_loop()
+    if _oauth_client is None or _oauth_client_loop is not loop:
+        _oauth_client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+        _oauth_client_loop = loop
+    return _oauth_client
+
+
+async def _refresh_yahoo_token(db: AsyncSession, user: User, now: datetime) -> bool:
     """Refresh Yahoo OAuth token."""
     if not user.yahoo_refresh_token:
         return False
     
     try:
         # Make refresh token request
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.login.yahoo.com/oauth2/get_token",
-                data={
-                    "grant_type": "refresh_token",
-                    "refresh_token": user.yahoo_refresh_token,
-                    "client_id": settings.yahoo_client_id,
-                    "client_secret": settings.yahoo_client_secret,
-                }
-            )
+        response = await _get_oauth_client().post(
+            "https://api.login.yahoo.com/oauth2/get_token",
+            data={
+                "grant_type": "refresh_token",
+                "refresh_token": user.yahoo_refresh_token,
+                "client_id": settings.yahoo_client_id,
+                "client_secret": settings.yahoo_client_secret,
+            }
+        )
+        
+        if response.status_code == 200:
+            token_data = orjson.loads(response.content)
+            user.yahoo_access_token = token_data['access_token']
+            if 'refresh_token' in token_data:
+                user.yahoo_refresh_token = token_data['refresh_token']
+            if 'expires_in' in token_data:
+                user.yahoo_token_expires_at = now + timedelta(seconds=token_data['expires_in'])
             
-            if response.status_code == 200:
-                token_data = response.json()
-                user.yahoo_access_token = token_data['access_token']
-                if 'refresh_token' in token_data:
-                    user.yahoo_refresh_token = token_data['refresh_token']
-                if 'expires_in' in token_data:
-                    user.yahoo_token_expires_at = datetime.utcnow() + timedelta(seconds=token_data['expires_in'])
-                
-                await db.commit()
-                return True
+            # Committed with the rest of the caller's transaction
+            return True
     
     except Exception as e:
-        print(f"Error refreshing Yahoo token: {e}")
+        logger.exception("Error refreshing Yahoo token: %s", e)
     
     return False
 
 
+_GAME_TO_LEAGUE = {
+    'nfl': LeagueType.FOOTBALL,
+    'nba': LeagueType.BASKETBALL,
+    'mlb': LeagueType.BASEBALL,
+    'nhl': LeagueType.HOCKEY,
+}
+
+# Checked in order, so "ppr" wins over "half" for e.g. "half_ppr"
+_YAHOO_SCORING_KEYWORDS = (('ppr', 'ppr'), ('half', 'half_ppr'))
+
+
 def _map_yahoo_sport_to_league_type(game_code: str) -> LeagueType:
     """Map Yahoo game code to our LeagueType enum."""
-    game_map = {
-        'nfl': LeagueType.FOOTBALL,
-        'nba': LeagueType.BASKETBALL,
-        'mlb': LeagueType.BASEBALL,
-        'nhl': LeagueType.HOCKEY,
-    }
-    return game_map.get(game_code.lower(), LeagueType.FOOTBALL)
+    return _GAME_TO_LEAGUE.get(game_code.lower(), LeagueType.FOOTBALL)
 
 
 def _determine_yahoo_scoring_type(settings: Dict[str, Any]) -> str:
@@ -454,13 +703,11 @@ def _determine_yahoo_scoring_type(settings: Dict[str, Any]) -> str:
     
     # Yahoo scoring type detection would be based on their specific settings
     # This is a placeholder implementation
-    scoring_type = settings.get('scoring_type', 'standard')
-    if 'ppr' in scoring_type.lower():
-        return "ppr"
-    elif 'half' in scoring_type.lower():
-        return "half_ppr"
-    else:
-        return "standard"
+    scoring_type = settings.get('scoring_type', 'standard').lower()
+    for keyword, result in _YAHOO_SCORING_KEYWORDS:
+        if keyword in scoring_type:
+            return result
+    return "standard"
 
 
 # Background task function
@@ -468,6 +715,6 @@ async def run_yahoo_ingestion(user_id: int):
     """Background task to run Yahoo ingestion."""
     success = await ingest_yahoo_leagues(user_id)
     if success:
-        print(f"Successfully ingested Yahoo leagues for user {user_id}")
+        logger.info("Successfully ingested Yahoo leagues for user %s", user_id)
     else:
-        print(f"Failed to ingest Yahoo leagues for user {user_id}")
+        logger.error("Failed to ingest Yahoo leagues for user %s", user_id)
@@ -2,19 +2,25 @@
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from config import settings
 from api.routes import auth, admin, webhooks
 from database.connection import init_db
+from utilities.logging_config import configure_queue_logging
+from schedulers.celery_app import app as celery_app  # noqa: F401 - binds .delay() to the Redis broker
 
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
+    configure_queue_logging()
+    
     app = FastAPI(
         title="AI Commissioner",
         description="Fantasy Sports AI Agent SaaS Platform",
         version="1.0.0",
         debug=settings.debug,
+        default_response_class=ORJSONResponse,
     )
     
     # CORS middleware
@@ -36,6 +42,11 @@ def create_app() -> FastAPI:
         """Initialize database on startup."""
         await init_db()
     
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        """Release pooled outbound connections."""
+        await auth.close_oauth_connections()
+    
     @app.get("/")
     async def root():
         """Health check endpoint."""
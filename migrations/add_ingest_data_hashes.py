@@ -0,0 +1,25 @@
+"""
+Database migration to add payload hashes to ingested rows.
+
+Ingestors skip rewriting rows whose provider payload hasn't changed since
+the last sync. This adds the following column to the rosters, matchups and
+transactions tables:
+- data_hash: VARCHAR(32) (blake2b hex digest of the source payload)
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    """Add data_hash columns."""
+    op.add_column('rosters', sa.Column('data_hash', sa.String(32), nullable=True))
+    op.add_column('matchups', sa.Column('data_hash', sa.String(32), nullable=True))
+    op.add_column('transactions', sa.Column('data_hash', sa.String(32), nullable=True))
+
+
+def downgrade():
+    """Remove data_hash columns."""
+    op.drop_column('transactions', 'data_hash')
+    op.drop_column('matchups', 'data_hash')
+    op.drop_column('rosters', 'data_hash')
@@ -0,0 +1,30 @@
+"""
+Database migration to add composite indexes for league lookups.
+
+Admin and webhook routes filter leagues on several columns at once, so this
+adds the following indexes:
+- ix_leagues_owner_provider_ext ON leagues (owner_id, provider, provider_league_id, season)
+- ix_leagues_provider_ext_active ON leagues (provider, provider_league_id, is_active)
+"""
+
+from alembic import op
+
+
+def upgrade():
+    """Add composite league lookup indexes."""
+    op.create_index(
+        'ix_leagues_owner_provider_ext',
+        'leagues',
+        ['owner_id', 'provider', 'provider_league_id', 'season']
+    )
+    op.create_index(
+        'ix_leagues_provider_ext_active',
+        'leagues',
+        ['provider', 'provider_league_id', 'is_active']
+    )
+
+
+def downgrade():
+    """Remove composite league lookup indexes."""
+    op.drop_index('ix_leagues_provider_ext_active', table_name='leagues')
+    op.drop_index('ix_leagues_owner_provider_ext', table_name='leagues')
@@ -0,0 +1,20 @@
+"""
+Database migration to track the last ingested league payload.
+
+Scheduled Sleeper syncs skip leagues whose payload hasn't changed since a
+recent full sync. This adds the following column to the leagues table:
+- last_payload_hash: VARCHAR(32) (blake2b hex digest of the league payload)
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    """Add last_payload_hash column to leagues table."""
+    op.add_column('leagues', sa.Column('last_payload_hash', sa.String(32), nullable=True))
+
+
+def downgrade():
+    """Remove last_payload_hash column from leagues table."""
+    op.drop_column('leagues', 'last_payload_hash')
@@ -0,0 +1,22 @@
+"""
+Database migration to add composite (league_id, week) indexes.
+
+Weekly summaries look up matchups and transactions by league and week, so
+this adds the following indexes:
+- ix_matchups_league_week ON matchups (league_id, week)
+- ix_transactions_league_week ON transactions (league_id, week)
+"""
+
+from alembic import op
+
+
+def upgrade():
+    """Add composite league/week indexes."""
+    op.create_index('ix_matchups_league_week', 'matchups', ['league_id', 'week'])
+    op.create_index('ix_transactions_league_week', 'transactions', ['league_id', 'week'])
+
+
+def downgrade():
+    """Remove composite league/week indexes."""
+    op.drop_index('ix_transactions_league_week', table_name='transactions')
+    op.drop_index('ix_matchups_league_week', table_name='matchups')
@@ -0,0 +1,51 @@
+"""
+Database migration to add unique provider ID constraints.
+
+Ingestors upsert rows with INSERT ... ON CONFLICT, which needs a unique
+constraint to resolve conflicts against. Duplicate rows left by the old
+select-then-insert sync are removed first, keeping the most recent row
+(highest id) for each key. This adds:
+- uq_rosters_league_provider_roster ON rosters (league_id, provider_roster_id)
+- uq_matchups_league_provider_matchup ON matchups (league_id, provider_matchup_id)
+- uq_transactions_league_provider_transaction ON transactions (league_id, provider_transaction_id)
+"""
+
+from alembic import op
+
+
+_PROVIDER_KEYS = [
+    ('rosters', 'provider_roster_id'),
+    ('matchups', 'provider_matchup_id'),
+    ('transactions', 'provider_transaction_id'),
+]
+
+
+def upgrade():
+    """Remove duplicate provider rows, then add unique provider ID constraints."""
+    for table, provider_column in _PROVIDER_KEYS:
+        op.execute(
+            f"""
+            DELETE FROM {table} a
+            USING {table} b
+            WHERE a.league_id = b.league_id
+              AND a.{provider_column} = b.{provider_column}
+              AND a.id < b.id
+            """
+        )
+    
+    op.create_unique_constraint(
+        'uq_rosters_league_provider_roster', 'rosters', ['league_id', 'provider_roster_id']
+    )
+    op.create_unique_constraint(
+        'uq_matchups_league_provider_matchup', 'matchups', ['league_id', 'provider_matchup_id']
+    )
+    op.create_unique_constraint(
+        'uq_transactions_league_provider_transaction', 'transactions', ['league_id', 'provider_transaction_id']
+    )
+
+
+def downgrade():
+    """Remove unique provider ID constraints."""
+    op.drop_constraint('uq_transactions_league_provider_transaction', 'transactions', type_='unique')
+    op.drop_constraint('uq_matchups_league_provider_matchup', 'matchups', type_='unique')
+    op.drop_constraint('uq_rosters_league_provider_roster', 'rosters', type_='unique')
@@ -0,0 +1,33 @@
+"""
+Database migration to store roster and transaction player data as JSONB.
+
+These columns previously held JSON serialized into TEXT. This converts
+the following columns to JSONB:
+- rosters.starters, rosters.bench, rosters.ir
+- transactions.players_added, transactions.players_dropped
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+_JSON_COLUMNS = [
+    ('rosters', 'starters'),
+    ('rosters', 'bench'),
+    ('rosters', 'ir'),
+    ('transactions', 'players_added'),
+    ('transactions', 'players_dropped'),
+]
+
+
+def upgrade():
+    """Convert JSON text columns to JSONB."""
+    for table, column in _JSON_COLUMNS:
+        op.alter_column(table, column, type_=JSONB, postgresql_using=f'{column}::jsonb')
+
+
+def downgrade():
+    """Convert JSONB columns back to JSON text."""
+    for table, column in _JSON_COLUMNS:
+        op.alter_column(table, column, type_=sa.Text(), postgresql_using=f'{column}::text')
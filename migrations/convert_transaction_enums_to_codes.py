@@ -0,0 +1,64 @@
+"""
+Database migration to store transaction types and statuses as one-character codes.
+
+The columns previously held enum member names in VARCHAR(20). This makes
+the following changes:
+- transactions.transaction_type: VARCHAR(20) -> VARCHAR(1)
+  (ADD='a', DROP='d', TRADE='t', WAIVER='w', FREE_AGENT='f')
+- transactions.status: VARCHAR(20) -> VARCHAR(1)
+  (PENDING='p', COMPLETED='c', FAILED='f', CANCELLED='x')
+- Recreates ck_transactions_transaction_type and ck_transactions_status
+  over the codes
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+_CODE_COLUMNS = [
+    ('transaction_type', 'ck_transactions_transaction_type', {
+        'ADD': 'a', 'DROP': 'd', 'TRADE': 't', 'WAIVER': 'w', 'FREE_AGENT': 'f',
+    }),
+    ('status', 'ck_transactions_status', {
+        'PENDING': 'p', 'COMPLETED': 'c', 'FAILED': 'f', 'CANCELLED': 'x',
+    }),
+]
+
+
+def _case(column: str, mapping: dict) -> str:
+    """SQL CASE expression translating column values through mapping."""
+    whens = " ".join(f"WHEN '{old}' THEN '{new}'" for old, new in mapping.items())
+    return f"CASE {column} {whens} END"
+
+
+def _in_list(values) -> str:
+    """SQL list literal of values."""
+    return ", ".join(f"'{value}'" for value in values)
+
+
+def upgrade():
+    """Convert enum names to one-character codes."""
+    for column, constraint_name, codes in _CODE_COLUMNS:
+        op.drop_constraint(constraint_name, 'transactions', type_='check')
+        op.alter_column(
+            'transactions', column,
+            type_=sa.String(1),
+            postgresql_using=_case(column, codes)
+        )
+        op.create_check_constraint(
+            constraint_name, 'transactions', f"{column} IN ({_in_list(codes.values())})"
+        )
+
+
+def downgrade():
+    """Convert one-character codes back to enum names."""
+    for column, constraint_name, codes in _CODE_COLUMNS:
+        op.drop_constraint(constraint_name, 'transactions', type_='check')
+        op.alter_column(
+            'transactions', column,
+            type_=sa.String(20),
+            postgresql_using=_case(column, {code: name for name, code in codes.items()})
+        )
+        op.create_check_constraint(
+            constraint_name, 'transactions', f"{column} IN ({_in_list(codes)})"
+        )
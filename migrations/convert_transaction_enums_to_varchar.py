@@ -0,0 +1,61 @@
+"""
+Database migration to store transaction types and statuses as VARCHAR.
+
+Native PostgreSQL enums need an ALTER TYPE for every new value, so this
+makes the following changes:
+- transactions.transaction_type: transactiontype enum -> VARCHAR(20) + CHECK
+- transactions.status: transactionstatus enum -> VARCHAR(20) + CHECK
+- Replaces ix_transactions_league_week with
+  ix_transactions_league_week_type ON transactions (league_id, week, transaction_type)
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# Enum member names, as SQLAlchemy stores them
+_TRANSACTION_TYPES = ('ADD', 'DROP', 'TRADE', 'WAIVER', 'FREE_AGENT')
+_TRANSACTION_STATUSES = ('PENDING', 'COMPLETED', 'FAILED', 'CANCELLED')
+
+_ENUM_COLUMNS = [
+    ('transaction_type', 'transactiontype', 'ck_transactions_transaction_type', _TRANSACTION_TYPES),
+    ('status', 'transactionstatus', 'ck_transactions_status', _TRANSACTION_STATUSES),
+]
+
+
+def upgrade():
+    """Convert transaction enums to checked VARCHAR columns."""
+    for column, enum_name, constraint_name, values in _ENUM_COLUMNS:
+        op.alter_column(
+            'transactions', column,
+            type_=sa.String(20),
+            postgresql_using=f'{column}::text'
+        )
+        op.create_check_constraint(
+            constraint_name, 'transactions',
+            f"{column} IN ({', '.join(repr(v) for v in values)})"
+        )
+        postgresql.ENUM(name=enum_name).drop(op.get_bind(), checkfirst=True)
+    
+    op.create_index(
+        'ix_transactions_league_week_type', 'transactions',
+        ['league_id', 'week', 'transaction_type']
+    )
+    op.drop_index('ix_transactions_league_week', table_name='transactions')
+
+
+def downgrade():
+    """Restore native enum columns and the league/week index."""
+    op.create_index('ix_transactions_league_week', 'transactions', ['league_id', 'week'])
+    op.drop_index('ix_transactions_league_week_type', table_name='transactions')
+    
+    for column, enum_name, constraint_name, values in _ENUM_COLUMNS:
+        op.drop_constraint(constraint_name, 'transactions', type_='check')
+        enum_type = postgresql.ENUM(*values, name=enum_name)
+        enum_type.create(op.get_bind(), checkfirst=True)
+        op.alter_column(
+            'transactions', column,
+            type_=enum_type,
+            postgresql_using=f'{column}::{enum_name}'
+        )
@@ -0,0 +1,20 @@
+"""
+Database migration to store users' Sleeper league IDs as JSONB.
+
+This converts the following column from JSON serialized into TEXT to JSONB:
+- users.sleeper_leagues
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+def upgrade():
+    """Convert users.sleeper_leagues to JSONB."""
+    op.alter_column('users', 'sleeper_leagues', type_=JSONB, postgresql_using='sleeper_leagues::jsonb')
+
+
+def downgrade():
+    """Convert users.sleeper_leagues back to JSON text."""
+    op.alter_column('users', 'sleeper_leagues', type_=sa.Text(), postgresql_using='sleeper_leagues::text')
@@ -0,0 +1,26 @@
+"""
+Database migration to drop single-column provider ID indexes.
+
+Every lookup filters on league_id together with the provider ID, which the
+(league_id, provider_*_id) unique constraints already index. The extra
+indexes only slowed down ingestion writes. This drops:
+- ix_rosters_provider_roster_id
+- ix_matchups_provider_matchup_id
+- ix_transactions_provider_transaction_id
+"""
+
+from alembic import op
+
+
+def upgrade():
+    """Drop single-column provider ID indexes."""
+    op.drop_index('ix_transactions_provider_transaction_id', table_name='transactions')
+    op.drop_index('ix_matchups_provider_matchup_id', table_name='matchups')
+    op.drop_index('ix_rosters_provider_roster_id', table_name='rosters')
+
+
+def downgrade():
+    """Recreate single-column provider ID indexes."""
+    op.create_index('ix_rosters_provider_roster_id', 'rosters', ['provider_roster_id'])
+    op.create_index('ix_matchups_provider_matchup_id', 'matchups', ['provider_matchup_id'])
+    op.create_index('ix_transactions_provider_transaction_id', 'transactions', ['provider_transaction_id'])
@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Optional
 from enum import Enum
 
-from sqlalchemy import DateTime, String, Integer, Boolean, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import DateTime, String, Integer, Boolean, Text, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -28,6 +28,12 @@ class League(Base):
     """League model for storing normalized league data from different providers."""
     
     __tablename__ = "leagues"
+    __table_args__ = (
+        # Duplicate check when a user creates a league
+        Index("ix_leagues_owner_provider_ext", "owner_id", "provider", "provider_league_id", "season"),
+        # Webhook lookups by provider league ID
+        Index("ix_leagues_provider_ext_active", "provider", "provider_league_id", "is_active"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
@@ -68,6 +74,7 @@ class League(Base):
     # Status
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     last_sync_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_payload_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)  # Provider league payload at last sync
     
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
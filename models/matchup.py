@@ -2,7 +2,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, String, Integer, ForeignKey, Float, Boolean
+from sqlalchemy import DateTime, String, Integer, ForeignKey, Float, Index, Boolean, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -13,11 +13,17 @@ class Matchup(Base):
     """Matchup model for storing weekly head-to-head matchup data."""
     
     __tablename__ = "matchups"
+    __table_args__ = (
+        # Weekly summaries always filter by league and week
+        Index("ix_matchups_league_week", "league_id", "week"),
+        # Ingestors upsert matchups by their provider ID within a league
+        UniqueConstraint("league_id", "provider_matchup_id", name="uq_matchups_league_provider_matchup"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     # Matchup identifiers
-    provider_matchup_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    provider_matchup_id: Mapped[str] = mapped_column(String(100), nullable=False)  # Indexed via the league unique constraint
     week: Mapped[int] = mapped_column(Integer, nullable=False)
     season: Mapped[int] = mapped_column(Integer, nullable=False)
     
@@ -41,6 +47,9 @@ class Matchup(Base):
     winner_roster_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     margin_of_victory: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     
+    # Hash of the provider payload this row was last ingested from
+    data_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
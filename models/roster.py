@@ -2,7 +2,8 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, String, Integer, ForeignKey, Text, Float
+from sqlalchemy import DateTime, String, Integer, ForeignKey, Float, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -13,11 +14,15 @@ class Roster(Base):
     """Roster model for storing team roster and performance data."""
     
     __tablename__ = "rosters"
+    __table_args__ = (
+        # Ingestors upsert rosters by their provider ID within a league
+        UniqueConstraint("league_id", "provider_roster_id", name="uq_rosters_league_provider_roster"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     # Provider-specific identifiers
-    provider_roster_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    provider_roster_id: Mapped[str] = mapped_column(String(100), nullable=False)  # Indexed via the league unique constraint
     provider_owner_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     
     # Team info
@@ -36,14 +41,17 @@ class Roster(Base):
     power_rank_previous: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     
     # Current roster data (JSON)
-    starters: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON array of player IDs
-    bench: Mapped[Optional[str]] = mapped_column(Text, nullable=True)    # JSON array of player IDs
-    ir: Mapped[Optional[str]] = mapped_column(Text, nullable=True)       # JSON array of player IDs
+    starters: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)  # Array of player IDs
+    bench: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)     # Array of player IDs
+    ir: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)        # Array of player IDs
     
     # FAAB/Waiver budget
     faab_budget: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     waiver_position: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     
+    # Hash of the provider payload this row was last ingested from
+    data_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,10 +1,12 @@
 """Transaction model for storing waiver wire and trade data."""
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional, Tuple, Type
 from enum import Enum
 
-from sqlalchemy import DateTime, String, Integer, ForeignKey, Float, Text, Enum as SQLEnum
+from sqlalchemy import CheckConstraint, DateTime, String, Integer, ForeignKey, Float, Index, Text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.sql import func
 
 from database.connection import Base
@@ -27,19 +29,76 @@ class TransactionStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+class EnumCode(TypeDecorator):
+    """Store a Python Enum as a one-character code column."""
+    
+    impl = String(1)
+    cache_ok = True
+    
+    def __init__(self, enum_class: Type[Enum], codes: Tuple[Tuple[Enum, str], ...]):
+        super().__init__()
+        self.enum_class = enum_class
+        self.codes = codes
+        self._to_code = dict(codes)
+        self._from_code = {code: member for member, code in codes}
+    
+    @property
+    def check_values(self) -> str:
+        """SQL list of the allowed codes, for a CHECK constraint."""
+        return ", ".join(f"'{code}'" for _, code in self.codes)
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self._to_code[self.enum_class(value)]
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._from_code[value]
+
+
+TRANSACTION_TYPE_CODES = EnumCode(TransactionType, (
+    (TransactionType.ADD, 'a'),
+    (TransactionType.DROP, 'd'),
+    (TransactionType.TRADE, 't'),
+    (TransactionType.WAIVER, 'w'),
+    (TransactionType.FREE_AGENT, 'f'),
+))
+TRANSACTION_STATUS_CODES = EnumCode(TransactionStatus, (
+    (TransactionStatus.PENDING, 'p'),
+    (TransactionStatus.COMPLETED, 'c'),
+    (TransactionStatus.FAILED, 'f'),
+    (TransactionStatus.CANCELLED, 'x'),
+))
+
+
 class Transaction(Base):
     """Transaction model for storing all league transactions (adds, drops, trades, etc.)."""
     
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Weekly summaries always filter by league and week; the trailing type
+        # column serves per-type recap scans from the same index
+        Index("ix_transactions_league_week_type", "league_id", "week", "transaction_type"),
+        # Ingestors upsert transactions by their provider ID within a league
+        UniqueConstraint("league_id", "provider_transaction_id", name="uq_transactions_league_provider_transaction"),
+        CheckConstraint(
+            f"transaction_type IN ({TRANSACTION_TYPE_CODES.check_values})",
+            name="ck_transactions_transaction_type"
+        ),
+        CheckConstraint(f"status IN ({TRANSACTION_STATUS_CODES.check_values})", name="ck_transactions_status"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     # Provider-specific identifiers
-    provider_transaction_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    provider_transaction_id: Mapped[str] = mapped_column(String(100), nullable=False)  # Indexed via the league unique constraint
     
-    # Transaction basic info
-    transaction_type: Mapped[TransactionType] = mapped_column(SQLEnum(TransactionType), nullable=False)
-    status: Mapped[TransactionStatus] = mapped_column(SQLEnum(TransactionStatus), default=TransactionStatus.PENDING)
+    # Transaction basic info. Stored as one-character codes + CHECK rather
+    # than native PG enums, so new values don't need an ALTER TYPE migration
+    transaction_type: Mapped[TransactionType] = mapped_column(TRANSACTION_TYPE_CODES, nullable=False)
+    status: Mapped[TransactionStatus] = mapped_column(TRANSACTION_STATUS_CODES, default=TransactionStatus.PENDING)
     week: Mapped[int] = mapped_column(Integer, nullable=False)
     
     # Involved parties
@@ -47,8 +106,8 @@ class Transaction(Base):
     trade_partner_roster_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)  # For trades
     
     # Players involved (JSON arrays)
-    players_added: Mapped[Optional[str]] = mapped_column(Text, nullable=True)    # JSON array of player objects
-    players_dropped: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON array of player objects
+    players_added: Mapped[Optional[Any]] = mapped_column(JSONB, nullable=True)    # Player objects, or player ID -> roster ID
+    players_dropped: Mapped[Optional[Any]] = mapped_column(JSONB, nullable=True)  # Player objects, or player ID -> roster ID
     
     # Financial details
     faab_bid: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
@@ -61,6 +120,9 @@ class Transaction(Base):
     # Additional metadata
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     
+    # Hash of the provider payload this row was last ingested from
+    data_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -3,6 +3,7 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import DateTime, String, Boolean, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -25,7 +26,7 @@ class User(Base):
     yahoo_token_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     
     # Sleeper integration (simple league ID)
-    sleeper_leagues: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON array of league IDs
+    sleeper_leagues: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)  # Array of league IDs
     
     # User preferences
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
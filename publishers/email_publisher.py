@@ -3,7 +3,7 @@ import asyncio
 import ssl
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 
 import aiosmtplib
@@ -11,6 +11,21 @@ import aiosmtplib
 from config import settings
 
 
+# Header used when every recipient is on the envelope only
+_UNDISCLOSED_RECIPIENTS = "undisclosed-recipients:;"
+
+# Basic styled layout wrapped around HTML email bodies
+_HTML_PREFIX = """<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+"""
+_HTML_SUFFIX = """
+    </div>
+</body>
+</html>
+"""
+
+
 class EmailPublisher:
     """Publisher for sending emails to league members."""
     
@@ -26,6 +41,53 @@ class EmailPublisher:
         self.username = username or settings.smtp_username
         self.password = password or settings.smtp_password
         self.from_email = settings.smtp_from_email or self.username
+        
+        # One authenticated connection is reused across sends until close()
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._smtp_lock = asyncio.Lock()
+    
+    async def close(self):
+        """Close the cached SMTP connection, if any."""
+        async with self._smtp_lock:
+            await self._drop_connection(graceful=True)
+    
+    async def _drop_connection(self, graceful: bool = False):
+        """Forget the cached connection so the next send reconnects."""
+        smtp, self._smtp = self._smtp, None
+        if smtp is None or not smtp.is_connected:
+            return
+        
+        if graceful:
+            try:
+                await smtp.quit()
+                return
+            except aiosmtplib.SMTPException:
+                pass
+        smtp.close()
+    
+    async def _get_smtp(self) -> aiosmtplib.SMTP:
+        """Return the cached SMTP connection, reconnecting if it was lost."""
+        if self._smtp is None or not self._smtp.is_connected:
+            self._smtp = await self._create_connection()
+        return self._smtp
+    
+    async def _send_messages(self, envelopes: List[Tuple[MIMEMultipart, Optional[List[str]]]]):
+        """
+        Send messages over the shared connection, dropping it on failure.
+        
+        Args:
+            envelopes: (message, recipients) pairs; recipients of None are
+                taken from the message's To/Cc/Bcc headers
+        """
+        async with self._smtp_lock:
+            smtp = await self._get_smtp()
+            try:
+                for msg, recipients in envelopes:
+                    await smtp.send_message(msg, recipients=recipients)
+            except Exception:
+                # The connection may be half-closed; reconnect on the next send
+                await self._drop_connection()
+                raise
     
     async def _create_connection(self) -> aiosmtplib.SMTP:
         """Create and configure async SMTP connection."""
@@ -54,10 +116,13 @@ class EmailPublisher:
         bcc_emails: Optional[List[str]] = None
     ) -> bool:
         """
-        Send an email to multiple recipients.
+        Send an email to multiple recipients in a single SMTP envelope.
+        
+        BCC recipients only appear on the envelope, never in the headers.
         
         Args:
-            to_emails: List of recipient email addresses
+            to_emails: List of recipient email addresses (may be empty when
+                bcc_emails is given)
             subject: Email subject line
             text_body: Plain text email body
             html_body: Optional HTML email body
@@ -67,7 +132,7 @@ class EmailPublisher:
         Returns:
             bool: True if successful, False otherwise
         """
-        if not to_emails or not subject or not text_body:
+        if not (to_emails or bcc_emails) or not subject or not text_body:
             print("Missing required email parameters")
             return False
         
@@ -76,7 +141,7 @@ class EmailPublisher:
             msg = MIMEMultipart('alternative')
             msg['Subject'] = subject
             msg['From'] = self.from_email
-            msg['To'] = ', '.join(to_emails)
+            msg['To'] = ', '.join(to_emails) if to_emails else _UNDISCLOSED_RECIPIENTS
             
             if cc_emails:
                 msg['Cc'] = ', '.join(cc_emails)
@@ -97,19 +162,36 @@ class EmailPublisher:
             if bcc_emails:
                 all_recipients.extend(bcc_emails)
             
-            # Send email
-            smtp = await self._create_connection()
-            try:
-                await smtp.send_message(msg)
-                print(f"Successfully sent email to {len(all_recipients)} recipients")
-                return True
-            finally:
-                await smtp.quit()
+            # Send email; the envelope is what actually delivers to BCC
+            await self._send_messages([(msg, all_recipients)])
+            print(f"Successfully sent email to {len(all_recipients)} recipients")
+            return True
                 
         except Exception as e:
             print(f"Error sending email: {e}")
             return False
     
+    async def send_many(self, messages: List[MIMEMultipart]) -> bool:
+        """
+        Send pre-built messages back to back over one SMTP connection.
+        
+        Args:
+            messages: MIME messages with their From/To headers already set
+            
+        Returns:
+            bool: True if every message was sent, False otherwise
+        """
+        if not messages:
+            return True
+        
+        try:
+            await self._send_messages([(msg, None) for msg in messages])
+            print(f"Successfully sent {len(messages)} emails")
+            return True
+        except Exception as e:
+            print(f"Error sending emails: {e}")
+            return False
+    
     async def send_with_retry(
         self, 
         to_emails: List[str], 
@@ -117,7 +199,8 @@ class EmailPublisher:
         text_body: str,
         html_body: Optional[str] = None,
         max_retries: int = 3, 
-        delay: float = 1.0
+        delay: float = 1.0,
+        bcc_emails: Optional[List[str]] = None
     ) -> bool:
         """
         Send email with retry logic.
@@ -129,12 +212,15 @@ class EmailPublisher:
             html_body: Optional HTML email body
             max_retries: Maximum number of retry attempts
             delay: Delay between retries in seconds
+            bcc_emails: Optional BCC recipients
             
         Returns:
             bool: True if successful, False otherwise
         """
         for attempt in range(max_retries + 1):
-            success = await self.send_email(to_emails, subject, text_body, html_body)
+            success = await self.send_email(
+                to_emails, subject, text_body, html_body, bcc_emails=bcc_emails
+            )
             
             if success:
                 return True
@@ -165,21 +251,13 @@ class EmailPublisher:
     
     def _convert_to_html(self, text: str) -> str:
         """Convert plain text to basic HTML formatting."""
-        # Replace newlines with <br> tags
-        html = text.replace('\n', '<br>\n')
-        
-        # Add basic styling
-        html = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                {html}
-            </div>
-        </body>
-        </html>
-        """
-        
-        return html
+        # Replace newlines with <br> tags and wrap in the styled layout
+        return _HTML_PREFIX + text.replace('\n', '<br>\n') + _HTML_SUFFIX
+    
+    @staticmethod
+    def _recap_subject(league_name: str, week: int, recap_type: str) -> str:
+        """Build the subject line for a recap email."""
+        return f"🏈 {league_name} - Week {week} {recap_type}"
     
     async def send_recap_email(
         self,
@@ -192,6 +270,9 @@ class EmailPublisher:
         """
         Send a fantasy football recap email.
         
+        All recipients are BCC'd on one envelope so members don't see each
+        other's addresses.
+        
         Args:
             to_emails: List of recipient email addresses
             league_name: Name of the fantasy league
@@ -202,18 +283,56 @@ class EmailPublisher:
         Returns:
             bool: True if successful, False otherwise
         """
-        subject = f"🏈 {league_name} - Week {week} {recap_type}"
+        subject = self._recap_subject(league_name, week, recap_type)
         
         # Create HTML version
         html_body = self._convert_to_html(recap_text)
         
         return await self.send_with_retry(
-            to_emails=to_emails,
+            to_emails=[],
             subject=subject,
             text_body=recap_text,
-            html_body=html_body
+            html_body=html_body,
+            bcc_emails=to_emails
         )
     
+    async def send_bulk_recaps(self, jobs: List[Dict[str, Any]]) -> bool:
+        """
+        Send many recap emails, merging jobs with the same content.
+        
+        Jobs whose subject and body match are coalesced into one envelope
+        with their recipient lists combined, then every envelope goes out
+        over the shared connection.
+        
+        Args:
+            jobs: Dicts of send_recap_email keyword arguments (to_emails,
+                league_name, week, recap_text and optionally recap_type)
+            
+        Returns:
+            bool: True if every email was sent, False otherwise
+        """
+        grouped: Dict[Tuple[str, str], Dict[str, None]] = {}
+        for job in jobs:
+            recap_type = job.get("recap_type", "Weekly Recap")
+            subject = self._recap_subject(job["league_name"], job["week"], recap_type)
+            recipients = grouped.setdefault((subject, job["recap_text"]), {})
+            # dict keys keep first-seen order while dropping duplicates
+            recipients.update(dict.fromkeys(job["to_emails"]))
+        
+        all_success = True
+        for (subject, recap_text), recipients in grouped.items():
+            success = await self.send_with_retry(
+                to_emails=[],
+                subject=subject,
+                text_body=recap_text,
+                html_body=self._convert_to_html(recap_text),
+                bcc_emails=list(recipients)
+            )
+            if not success:
+                all_success = False
+        
+        return all_success
+    
     async def send_transaction_alert(
         self,
         to_emails: List[str],
@@ -295,7 +414,10 @@ async def send_recap_email(
         bool: True if successful
     """
     publisher = EmailPublisher()
-    return await publisher.send_recap_email(to_emails, league_name, week, recap_text, recap_type)
+    try:
+        return await publisher.send_recap_email(to_emails, league_name, week, recap_text, recap_type)
+    finally:
+        await publisher.close()
 
 
 # Background task function
@@ -1,24 +1,85 @@
 """GroupMe publisher for sending fantasy sports recaps."""
 import asyncio
+import time
+from email.utils import parsedate_to_datetime
 from typing import Optional, Dict, Any
 import httpx
-from datetime import datetime
+from datetime import datetime, timezone
 
 from config import settings
 
 
+# Shared by every publisher so recaps reuse one pooled HTTP/2 connection to
+# api.groupme.com. Connections belong to the event loop that opened them and
+# Celery tasks each run their own loop, so the client is rebuilt when the
+# running loop changes.
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Get the shared GroupMe client for the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_groupme_client():
+    """Close the shared GroupMe client before its event loop shuts down."""
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+class _TokenBucket:
+    """Spaces out calls to at most `rate` per second, with bursts up to `capacity`."""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+    
+    async def acquire(self):
+        """Wait for a token. A negative balance is the queue of callers ahead."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+# Per-bot limits, shared by every publisher so concurrent recaps to the same
+# group still pace themselves. Safe across event loops: no locks, and the
+# reservation happens before the only await.
+_bot_buckets: Dict[str, _TokenBucket] = {}
+
+
 class GroupMePublisher:
     """Publisher for sending messages to GroupMe groups via bot."""
     
     BASE_URL = "https://api.groupme.com/v3"
+    MAX_RATE_LIMIT_RETRIES = 3
+    BOT_POSTS_PER_SECOND = 2.0
+    BOT_POST_BURST = 4
     
     def __init__(self, access_token: Optional[str] = None):
         self.access_token = access_token or settings.groupme_access_token
-        self.client = httpx.AsyncClient(timeout=30.0)
     
-    async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared HTTP client; release it with close_groupme_client()."""
+        return _get_client()
     
     async def publish_groupme(self, bot_id: str, text: str, attachments: Optional[list] = None) -> bool:
         """
@@ -45,11 +106,22 @@ class GroupMePublisher:
         if attachments:
             payload["attachments"] = attachments
         
+        bucket = _bot_buckets.get(bot_id)
+        if bucket is None:
+            bucket = _bot_buckets[bot_id] = _TokenBucket(self.BOT_POSTS_PER_SECOND, self.BOT_POST_BURST)
+        
         try:
-            response = await self.client.post(
-                f"{self.BASE_URL}/bots/post",
-                json=payload
-            )
+            for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+                await bucket.acquire()
+                response = await self.client.post(
+                    f"{self.BASE_URL}/bots/post",
+                    json=payload
+                )
+                if response.status_code != 429 or attempt == self.MAX_RATE_LIMIT_RETRIES:
+                    break
+                
+                # Rate limited: wait as long as GroupMe asks before retrying
+                await asyncio.sleep(_retry_after_seconds(response.headers.get("Retry-After")))
             
             if response.status_code == 202:
                 print(f"Successfully sent message to GroupMe bot {bot_id}")
@@ -245,12 +317,12 @@ class GroupMePublisher:
         # Try to truncate at a natural break point
         truncated = text[:max_length - 3]  # Leave room for "..."
         
-        # Find the last newline or sentence ending
-        last_newline = truncated.rfind('\n')
-        last_period = truncated.rfind('.')
-        last_break = max(last_newline, last_period)
+        # Find the last newline or sentence ending, only searching the tail
+        # where a break point is reasonable (past 80% of the limit)
+        min_break = int(max_length * 0.8) + 1
+        last_break = max(truncated.rfind('\n', min_break), truncated.rfind('.', min_break))
         
-        if last_break > max_length * 0.8:  # If break point is reasonable
+        if last_break != -1:
             return truncated[:last_break + 1] + "..."
         else:
             return truncated + "..."
@@ -269,28 +341,29 @@ class GroupMePublisher:
         if len(text) <= 1000:
             return await self.publish_groupme(bot_id, text)
         
-        # Split into multiple messages
-        lines = text.split('\n')
-        current_message = ""
+        # Split into multiple messages, collecting lines in a buffer and
+        # tracking its joined length rather than re-concatenating strings
         messages = []
+        buffer = []
+        size = 0
         
-        for line in lines:
-            if len(current_message + line + '\n') > 950:  # Leave some buffer
-                if current_message:
-                    messages.append(current_message.strip())
-                current_message = line + '\n'
-            else:
-                current_message += line + '\n'
+        for line in text.split('\n'):
+            line_size = len(line) + 1  # Line plus its newline
+            if size + line_size > 950:  # Leave some buffer
+                if buffer:
+                    messages.append('\n'.join(buffer).strip())
+                buffer.clear()
+                size = 0
+            buffer.append(line)
+            size += line_size
         
-        if current_message:
-            messages.append(current_message.strip())
+        if buffer:
+            messages.append('\n'.join(buffer).strip())
         
-        # Send each part with a small delay
+        # Send parts in order so they read top to bottom in the chat; the
+        # per-bot token bucket in publish_groupme paces them
         all_success = True
         for i, message in enumerate(messages):
-            if i > 0:
-                await asyncio.sleep(0.5)  # Small delay between messages
-            
             success = await self.publish_groupme(bot_id, f"({i+1}/{len(messages)}) {message}")
             if not success:
                 all_success = False
@@ -298,6 +371,21 @@ class GroupMePublisher:
         return all_success
 
 
+def _retry_after_seconds(value: Optional[str], default: float = 1.0) -> float:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
 # Convenience function for simple usage
 async def send_to_groupme(bot_id: str, text: str) -> bool:
     """
@@ -311,10 +399,7 @@ async def send_to_groupme(bot_id: str, text: str) -> bool:
         bool: True if successful
     """
     publisher = GroupMePublisher()
-    try:
-        return await publisher.send_with_retry(bot_id, text)
-    finally:
-        await publisher.close()
+    return await publisher.send_with_retry(bot_id, text)
 
 
 # Background task function
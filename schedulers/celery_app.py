@@ -1,10 +1,12 @@
 """Celery application configuration for task scheduling."""
 from celery import Celery
+from celery.signals import after_setup_logger
 from celery.schedules import crontab
 from datetime import timedelta
 import pytz
 
 from config import settings
+from utilities.logging_config import configure_queue_logging
 
 # Create Celery app
 app = Celery('aicommissioner')
@@ -24,6 +26,8 @@ app.conf.update(
         'schedulers.tasks.run_weekly_power_rankings': {'queue': 'recaps'},
         'schedulers.tasks.run_weekly_waiver_recaps': {'queue': 'recaps'},
         'schedulers.tasks.sync_all_leagues': {'queue': 'sync'},
+        'schedulers.tasks.sync_specific_league': {'queue': 'sync'},
+        'schedulers.tasks.generate_manual_recap': {'queue': 'recaps'},
         'schedulers.tasks.cleanup_old_data': {'queue': 'maintenance'},
     },
     
@@ -35,7 +39,10 @@ app.conf.update(
     task_soft_time_limit=300,  # 5 minutes
     task_time_limit=600,       # 10 minutes
     
-    # Result settings
+    # Result settings. Nothing reads task results back, so skip the backend
+    # write on every completion; a task that needs its result can opt back
+    # in with ignore_result=False
+    task_ignore_result=True,
     result_expires=3600,  # 1 hour
     
     # Beat schedule for recurring tasks
@@ -106,6 +113,13 @@ app.conf.update(
     },
 )
 
+
+@after_setup_logger.connect
+def _queue_worker_logging(logger, **kwargs):
+    """Move Celery's log handlers behind a queue once it has configured them."""
+    configure_queue_logging()
+
+
 # Import tasks to register them
 from schedulers import tasks
 
@@ -1,20 +1,49 @@
 """Celery tasks for scheduled operations."""
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
+import redis
 from celery import shared_task
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 
+from config import settings
 from database.connection import AsyncSessionLocal
 from models.league import League, ProviderType
 from models.user import User
 from models.transaction import Transaction
 from models.matchup import Matchup
 from services.recap_service import run_power_rankings, run_waiver_recap
-from ingestors.sleeper_ingestor import ingest_sleeper_league
-from ingestors.yahoo_ingestor import ingest_yahoo_leagues
+from ingestors.sleeper_ingestor import ingest_sleeper_league, run_sleeper_ingestion_batch
+from ingestors.yahoo_ingestor import create_yahoo_session, ingest_yahoo_leagues
+from publishers.groupme_publisher import close_groupme_client
+
+# Leagues whose recaps are generated and published at once; each holds a
+# database connection while it runs
+MAX_CONCURRENT_RECAPS = 10
+
+# Held by webhooks while a Sleeper league sync is queued or running; the
+# value is a token identifying the sync task that owns it
+SLEEPER_INGEST_LOCK_KEY = "ingest:sleeper:{}"
+
+# Delete the lock only if it still holds our token (atomic compare-and-delete)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_redis_client: Optional[redis.Redis] = None
+
+
+def _get_redis() -> redis.Redis:
+    """Get the shared Redis client used for ingestion locks."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.redis_url)
+    return _redis_client
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
@@ -24,7 +53,7 @@ def run_weekly_power_rankings(self):
     Runs Tuesday 9:00 AM Chicago time.
     """
     try:
-        return asyncio.run(_run_weekly_power_rankings())
+        return asyncio.run(_run_publishing(_run_weekly_power_rankings()))
     except Exception as exc:
         # Retry with exponential backoff
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
@@ -37,7 +66,7 @@ def run_weekly_waiver_recaps(self):
     Runs Wednesday 9:00 AM Chicago time.
     """
     try:
-        return asyncio.run(_run_weekly_waiver_recaps())
+        return asyncio.run(_run_publishing(_run_weekly_waiver_recaps()))
     except Exception as exc:
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
@@ -55,7 +84,12 @@ def sync_all_leagues(self):
 
 
 @shared_task
-def sync_specific_league(league_id: int, provider: str, provider_league_id: str):
+def sync_specific_league(
+    league_id: int,
+    provider: str,
+    provider_league_id: str,
+    lock_token: Optional[str] = None
+):
     """
     Task to sync a specific league.
     
@@ -63,8 +97,19 @@ def sync_specific_league(league_id: int, provider: str, provider_league_id: str)
         league_id: Internal league ID
         provider: Provider type ("sleeper" or "yahoo")
         provider_league_id: Provider-specific league ID
+        lock_token: Token of the webhook ingest lock this sync owns, if any;
+            the lock is released only when it still holds this token
     """
-    return asyncio.run(_sync_specific_league(league_id, provider, provider_league_id))
+    try:
+        return asyncio.run(_sync_specific_league(league_id, provider, provider_league_id))
+    finally:
+        if lock_token is not None:
+            try:
+                _get_redis().eval(
+                    _RELEASE_LOCK_SCRIPT, 1, SLEEPER_INGEST_LOCK_KEY.format(provider_league_id), lock_token
+                )
+            except redis.RedisError as e:
+                print(f"Error releasing ingest lock for league {provider_league_id}: {e}")
 
 
 @shared_task
@@ -77,7 +122,7 @@ def generate_manual_recap(league_id: int, recap_type: str, week: Optional[int] =
         recap_type: Type of recap ("power_rankings" or "waiver_recap")
         week: Optional week number
     """
-    return asyncio.run(_generate_manual_recap(league_id, recap_type, week))
+    return asyncio.run(_run_publishing(_generate_manual_recap(league_id, recap_type, week)))
 
 
 @shared_task
@@ -104,10 +149,48 @@ def health_check():
 
 # Async implementations
 
-async def _run_weekly_power_rankings():
-    """Run power rankings for all enabled leagues."""
+async def _run_publishing(coro):
+    """Await a recap coroutine, then close the shared GroupMe client with its loop."""
+    try:
+        return await coro
+    finally:
+        await close_groupme_client()
+
+
+async def _run_league_recaps(leagues, run_recap, week_for, recap_name: str):
+    """
+    Run a recap for each league concurrently, up to MAX_CONCURRENT_RECAPS at once.
+    
+    Args:
+        leagues: Leagues to run the recap for
+        run_recap: Recap coroutine function taking (league_id, week)
+        week_for: Picks the week to recap for a league
+        recap_name: Recap name for log and error messages
+    """
     results = {"successful": 0, "failed": 0, "skipped": 0, "errors": []}
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_RECAPS)
     
+    async def run_one(league: League):
+        week = week_for(league)
+        async with semaphore:
+            print(f"Generating {recap_name} for {league.name} (Week {week})")
+            await run_recap(league.id, week)
+    
+    outcomes = await asyncio.gather(*(run_one(league) for league in leagues), return_exceptions=True)
+    for league, outcome in zip(leagues, outcomes):
+        if isinstance(outcome, BaseException):
+            error_msg = f"Failed {recap_name} for league {league.id}: {str(outcome)}"
+            print(error_msg)
+            results["failed"] += 1
+            results["errors"].append(error_msg)
+        else:
+            results["successful"] += 1
+    
+    return results
+
+
+async def _run_weekly_power_rankings():
+    """Run power rankings for all enabled leagues."""
     async with AsyncSessionLocal() as db:
         # Get all active leagues with power rankings enabled
         result = await db.execute(
@@ -118,33 +201,17 @@ async def _run_weekly_power_rankings():
             )
         )
         leagues = result.scalars().all()
-        
-        print(f"Running power rankings for {len(leagues)} leagues")
-        
-        for league in leagues:
-            try:
-                # Calculate week (previous week for review)
-                current_week = league.week or 1
-                review_week = max(1, current_week - 1)
-                
-                print(f"Generating power rankings for {league.name} (Week {review_week})")
-                
-                await run_power_rankings(league.id, review_week)
-                results["successful"] += 1
-                
-            except Exception as e:
-                error_msg = f"Failed power rankings for league {league.id}: {str(e)}"
-                print(error_msg)
-                results["failed"] += 1
-                results["errors"].append(error_msg)
     
-    return results
+    print(f"Running power rankings for {len(leagues)} leagues")
+    
+    # Review the previous week
+    return await _run_league_recaps(
+        leagues, run_power_rankings, lambda league: max(1, (league.week or 1) - 1), "power rankings"
+    )
 
 
 async def _run_weekly_waiver_recaps():
     """Run waiver recaps for all enabled leagues."""
-    results = {"successful": 0, "failed": 0, "skipped": 0, "errors": []}
-    
     async with AsyncSessionLocal() as db:
         # Get all active leagues with waiver recaps enabled
         result = await db.execute(
@@ -155,26 +222,13 @@ async def _run_weekly_waiver_recaps():
             )
         )
         leagues = result.scalars().all()
-        
-        print(f"Running waiver recaps for {len(leagues)} leagues")
-        
-        for league in leagues:
-            try:
-                # Use current week for waiver recap (Wednesday covers Tuesday waivers)
-                current_week = league.week or 1
-                
-                print(f"Generating waiver recap for {league.name} (Week {current_week})")
-                
-                await run_waiver_recap(league.id, current_week)
-                results["successful"] += 1
-                
-            except Exception as e:
-                error_msg = f"Failed waiver recap for league {league.id}: {str(e)}"
-                print(error_msg)
-                results["failed"] += 1
-                results["errors"].append(error_msg)
     
-    return results
+    print(f"Running waiver recaps for {len(leagues)} leagues")
+    
+    # Use current week for waiver recap (Wednesday covers Tuesday waivers)
+    return await _run_league_recaps(
+        leagues, run_waiver_recap, lambda league: league.week or 1, "waiver recap"
+    )
 
 
 async def _sync_all_leagues():
@@ -189,51 +243,53 @@ async def _sync_all_leagues():
         leagues = result.scalars().all()
         
         print(f"Syncing {len(leagues)} leagues")
+        now = datetime.now(timezone.utc)
         
         # Group leagues by provider for efficient processing
         sleeper_leagues = [l for l in leagues if l.provider == ProviderType.SLEEPER]
         yahoo_leagues = [l for l in leagues if l.provider == ProviderType.YAHOO]
         
-        # Sync Sleeper leagues
-        for league in sleeper_leagues:
-            try:
-                success = await ingest_sleeper_league(league.provider_league_id)
-                if success:
-                    results["successful"] += 1
-                    # Update last sync time
-                    league.last_sync_at = datetime.utcnow()
-                else:
-                    results["failed"] += 1
-                    results["errors"].append(f"Sleeper sync failed for league {league.id}")
-                    
-            except Exception as e:
-                error_msg = f"Error syncing Sleeper league {league.id}: {str(e)}"
+        # Sync Sleeper leagues concurrently
+        sleeper_results = await run_sleeper_ingestion_batch(
+            [league.provider_league_id for league in sleeper_leagues]
+        )
+        for league, outcome in zip(sleeper_leagues, sleeper_results):
+            if isinstance(outcome, BaseException):
+                error_msg = f"Error syncing Sleeper league {league.id}: {str(outcome)}"
                 print(error_msg)
                 results["failed"] += 1
                 results["errors"].append(error_msg)
+            elif outcome:
+                # Ingestion records last_sync_at itself, and leaves it alone
+                # when it skips an unchanged league
+                results["successful"] += 1
+            else:
+                results["failed"] += 1
+                results["errors"].append(f"Sleeper sync failed for league {league.id}")
         
-        # Sync Yahoo leagues (grouped by user)
+        # Sync Yahoo leagues (grouped by user), sharing one connection pool
         yahoo_users = set(l.owner_id for l in yahoo_leagues)
-        for user_id in yahoo_users:
-            try:
-                success = await ingest_yahoo_leagues(user_id)
-                if success:
-                    # Update last sync time for all leagues of this user
-                    user_leagues = [l for l in yahoo_leagues if l.owner_id == user_id]
-                    for league in user_leagues:
-                        league.last_sync_at = datetime.utcnow()
-                    results["successful"] += len(user_leagues)
-                else:
+        async with create_yahoo_session() as yahoo_session:
+            for user_id in yahoo_users:
+                try:
+                    success = await ingest_yahoo_leagues(user_id, yahoo_session)
+                    if success:
+                        # Update last sync time for all leagues of this user
+                        user_leagues = [l for l in yahoo_leagues if l.owner_id == user_id]
+                        for league in user_leagues:
+                            league.last_sync_at = now
+                        results["successful"] += len(user_leagues)
+                    else:
+                        user_leagues = [l for l in yahoo_leagues if l.owner_id == user_id]
+                        results["failed"] += len(user_leagues)
+                        results["errors"].append(f"Yahoo sync failed for user {user_id}")
+                    
+                except Exception as e:
+                    error_msg = f"Error syncing Yahoo leagues for user {user_id}: {str(e)}"
+                    print(error_msg)
                     user_leagues = [l for l in yahoo_leagues if l.owner_id == user_id]
                     results["failed"] += len(user_leagues)
-                    results["errors"].append(f"Yahoo sync failed for user {user_id}")
-                    
-            except Exception as e:
-                error_msg = f"Error syncing Yahoo leagues for user {user_id}: {str(e)}"
-                print(error_msg)
-                user_leagues = [l for l in yahoo_leagues if l.owner_id == user_id]
-                results["failed"] += len(user_leagues)
-                results["errors"].append(error_msg)
+                    results["errors"].append(error_msg)
         
         await db.commit()
     
@@ -244,7 +300,7 @@ async def _sync_specific_league(league_id: int, provider: str, provider_league_i
     """Sync a specific league."""
     try:
         if provider.lower() == "sleeper":
-            success = await ingest_sleeper_league(provider_league_id)
+            success = await ingest_sleeper_league(provider_league_id, force=True)
         elif provider.lower() == "yahoo":
             # For Yahoo, we need the user ID, which we'll get from the league
             async with AsyncSessionLocal() as db:
@@ -263,7 +319,7 @@ async def _sync_specific_league(league_id: int, provider: str, provider_league_i
                 result = await db.execute(select(League).filter(League.id == league_id))
                 league = result.scalar_one_or_none()
                 if league:
-                    league.last_sync_at = datetime.utcnow()
+                    league.last_sync_at = datetime.now(timezone.utc)
                     await db.commit()
             
             return {"status": "success", "message": f"Synced league {league_id}"}
@@ -297,7 +353,8 @@ async def _cleanup_old_data():
     try:
         async with AsyncSessionLocal() as db:
             # Delete transactions older than 2 seasons
-            cutoff_date = datetime.utcnow() - timedelta(days=730)  # ~2 years
+            now = datetime.now(timezone.utc)
+            cutoff_date = now - timedelta(days=730)  # ~2 years
             
             # Delete old transactions
             result = await db.execute(
@@ -306,7 +363,7 @@ async def _cleanup_old_data():
             results["deleted_transactions"] = result.rowcount
             
             # Delete old matchups (keep current and last season)
-            current_year = datetime.now().year
+            current_year = now.year
             old_season = current_year - 2
             
             result = await db.execute(
@@ -329,7 +386,7 @@ async def _cleanup_old_data():
 async def _health_check():
     """Perform health check of the system."""
     health_status = {
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
         "database": "unknown",
         "redis": "unknown",
         "active_leagues": 0,
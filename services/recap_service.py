@@ -24,7 +24,7 @@ class RecapService:
     
     async def close(self):
         """Clean up resources."""
-        await self.groupme_publisher.close()
+        await self.email_publisher.close()
     
     def _get_league_member_emails(self, league: League) -> List[str]:
         """Parse and return league member emails from JSON string."""
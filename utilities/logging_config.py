@@ -0,0 +1,65 @@
+"""Logging setup that keeps handler I/O off the event loop."""
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_queue_logging(level: int = logging.INFO):
+    """
+    Route root logger output through a queue drained by a background thread.
+    
+    Log calls from async code then only enqueue the record; formatting and
+    the blocking write happen on the listener thread. Handlers already
+    installed on the root logger (e.g. by Celery) are moved behind the
+    queue; a stderr handler is used if there are none. Safe to call more
+    than once. Forked children (e.g. Celery prefork workers) get their own
+    queue and listener thread, since threads don't survive a fork.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    
+    root = logging.getLogger()
+    handlers = root.handlers[:] or [logging.StreamHandler(sys.stderr)]
+    if not root.handlers:
+        handlers[0].setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    if root.level == logging.NOTSET or root.level > level:
+        root.setLevel(level)
+    
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def _restart_listener_in_child():
+    """Give a forked process a fresh queue and listener thread."""
+    global _listener
+    if _listener is None:
+        return
+    
+    # The inherited queue may have been mid-get in the parent's listener
+    # thread, so its lock can't be trusted; start over with a new one
+    atexit.unregister(_listener.stop)
+    log_queue: queue.Queue = queue.Queue(-1)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, QueueHandler):
+            handler.queue = log_queue
+    
+    _listener = QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+os.register_at_fork(after_in_child=_restart_listener_in_child)